@@ -1,77 +1,21 @@
-import numpy as np
+import rendering
 import matplotlib.pyplot as plt
-from datetime import datetime
-from geopy.geocoders import Nominatim
-
-# Function to simulate Sun's position in Cartesian coordinates
-def sun_position(hour, latitude):
-    t = (hour / 24 * 2 * np.pi)  # Normalize hour to radians for smooth movement
-
-    # Sun's path: cosine for east-west (x), sine for north-south (y)
-    # Latitude affects how high the Sun is at noon (zenith angle)
-    zenith_angle = np.radians(90 - latitude)  # Adjust Sun's altitude based on latitude
-
-    # Calculate the Sun's position based on the zenith angle
-    x = np.cos(t)  # East-West movement
-    y = np.sin(t) * np.cos(zenith_angle)  # Adjust for latitude
-
-    return x, y
-
-# Function to simulate Moon's position in Cartesian coordinates (simplified)
-def moon_position(hour):
-    t = (hour / 24 * 2 * np.pi)  # Normalize hour to radians for the Moon's movement
-
-    # Moon's path: slower eastward movement
-    x = np.cos(t * 0.5)  # Moon moves eastward slower
-    y = np.sin(t * 0.5)  # Moon moves slightly up/down
-
-    return x, y
-
-# Get the current time and extract the hour of the day
-current_time = datetime.now()
-current_hour = current_time.hour + current_time.minute / 60  # Get the current hour as a float
-
-# Function to get latitude and longitude based on country or coordinates
-def get_coordinates(location):
-    geolocator = Nominatim(user_agent="sun_moon_simulator")
-
-    try:
-        # Try to geocode based on country name
-        location_data = geolocator.geocode(location)
-        if location_data:
-            return location_data.latitude, location_data.longitude
-        else:
-            raise ValueError("Location not found.")
-    except Exception as e:
-        print(f"Error: {e}")
-        return None, None
-
-# Function to adjust the time based on longitude
-def adjust_time_for_location(longitude):
-    # Longitude influences the time zone; every 15° corresponds to one hour
-    utc_offset = longitude / 15  # Time zone offset based on longitude
-    local_time = current_hour + utc_offset  # Adjust current hour to local time
-    # Normalize the time to 24-hour format (wrap around if needed)
-    return local_time % 24
+import time
+from geocoding import resolve_location
+from timescale import local_hours
+from ephemeris import daily_sun_xy, daily_moon_xy
 
 # Input location (can be country or specific coordinates)
 location_input = input("Enter location (country or latitude,longitude): ")
 
-# Determine if the input is a pair of coordinates or a country name
-if ',' in location_input:
-    try:
-        lat, lon = map(float, location_input.split(','))
-    except ValueError:
-        print("Invalid coordinates format. Please enter in 'latitude,longitude' format.")
-        exit(1)
-else:
-    lat, lon = get_coordinates(location_input)
-    if lat is None or lon is None:
-        print("Could not find the location. Please enter a valid location.")
-        exit(1)
+# The input is either a pair of coordinates or a place name
+lat, lon = resolve_location(location_input)
+if lat is None or lon is None:
+    print("Could not find the location. Please enter a valid location.")
+    exit(1)
 
-# Adjust the current time based on the longitude
-local_hour = adjust_time_for_location(lon)
+# Current local clock time at the location, from its real time zone (daylight saving included)
+local_hour = float(local_hours(time.time(), lat, lon))
 
 # Setup a 2D grid plot with the Earth at origin (0,0)
 fig, ax = plt.subplots(figsize=(8, 8))
@@ -97,8 +41,8 @@ ax.plot([0, 0], [0, -1.5], 'k-', label="South (S)")  # S (negative y direction)
 ax.plot([0, 1], [0, -1], 'k--', label="Southeast (SE)")
 
 # Get Sun and Moon positions at the current local time
-sun_x, sun_y = sun_position(local_hour, lat)  # Get Sun's position based on location's latitude and time
-moon_x, moon_y = moon_position(local_hour)  # Get Moon's position for the current hour
+sun_x, sun_y = daily_sun_xy(local_hour, lat)  # Get Sun's position based on location's latitude and time
+moon_x, moon_y = daily_moon_xy(local_hour)  # Get Moon's position for the current hour
 
 # Plot Sun's position (using local time)
 ax.plot(sun_x, sun_y, 'ro', label=f"Sun at {local_hour:.2f}h")
@@ -110,4 +54,4 @@ ax.plot(moon_x, moon_y, 'bo', label=f"Moon at {local_hour:.2f}h")
 ax.legend()
 
 # Display the plot
-plt.show()
+rendering.show(fig)
@@ -1,82 +1,27 @@
-import numpy as np
+import rendering
 import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
-from datetime import datetime, timedelta
-from geopy.geocoders import Nominatim
-
-# Convert azimuth and altitude to radians
-def degrees_to_radians(degrees):
-    return np.radians(degrees)
-
-# Function to calculate the Cartesian coordinates based on Azimuth and Altitude
-def calculate_position(azimuth, altitude, distance):
-    # Convert azimuth and altitude to radians
-    azimuth_rad = degrees_to_radians(azimuth)
-    altitude_rad = degrees_to_radians(altitude)
-    
-    # Calculate Cartesian coordinates with distance (scaled for simulation)
-    x = distance * np.cos(altitude_rad) * np.sin(azimuth_rad)  # East-West (x-axis)
-    y = distance * np.cos(altitude_rad) * np.cos(azimuth_rad)  # North-South (y-axis)
-    z = distance * np.sin(altitude_rad)  # Altitude (z-axis)
-    
-    return x, y, z
-
-# Function to get latitude and longitude based on country or coordinates
-def get_coordinates(location):
-    geolocator = Nominatim(user_agent="sun_moon_simulator")
-    try:
-        location_data = geolocator.geocode(location)
-        if location_data:
-            return location_data.latitude, location_data.longitude
-        else:
-            raise ValueError("Location not found.")
-    except Exception as e:
-        print(f"Error: {e}")
-        return None, None
-
-# Function to adjust the time based on longitude (Longitude affects the time zone)
-def adjust_time_for_location(longitude):
-    utc_offset = longitude / 15  # Time zone offset based on longitude
-    current_time = datetime.utcnow()  # Get current UTC time
-    local_time = current_time + timedelta(hours=utc_offset)  # Adjust current time to local time
-    return local_time
-
-# Get the current time and extract the hour of the day
-def get_local_time(location):
-    latitude, longitude = get_coordinates(location)
-    if latitude is None or longitude is None:
-        return None
-    local_time = adjust_time_for_location(longitude)
-    return local_time.hour + local_time.minute / 60  # Convert time to decimal hours
-
-# Given Azimuth and Altitude for Sun and Moon
-def get_sun_and_moon_positions(hour, latitude):
-    sun_t = (hour / 24) * 2 * np.pi  # Normalize hour to radians for smooth movement
-    sun_azimuth = (sun_t + np.pi) % (2 * np.pi)  # Azimuth calculation (relative to local time)
-    sun_altitude = 90 - latitude  # Altitude based on latitude (simplified)
-    
-    moon_t = (hour / 24) * np.pi  # Moon moves more slowly than the Sun
-    moon_azimuth = (moon_t + np.pi) % (2 * np.pi)  # Azimuth calculation
-    moon_altitude = 90 - latitude + 10 * np.sin(moon_t)  # Some variation in altitude
-    
-    return np.degrees(sun_azimuth), 90 - np.degrees(sun_altitude), np.degrees(moon_azimuth), 90 - np.degrees(moon_altitude)
+import time
+from geocoding import resolve_location
+from ephemeris import PLANETS, calculate_position, planet_altaz, sun_and_moon_positions
+from geometry import plot_sphere
+from timescale import local_hours
 
 # Input location (can be country or specific coordinates)
 location_input = input("Enter location (country or latitude,longitude): ")
 
-# Get the local time (in decimal hours)
-local_hour = get_local_time(location_input)
+# Resolve the location once and reuse it for both the time and the latitude
+latitude, longitude = resolve_location(location_input)
 
 # If location not found, exit
-if local_hour is None:
+if latitude is None or longitude is None:
     print("Invalid location, unable to get local time.")
     exit()
 
-# Get the latitude from the location input
-latitude, longitude = get_coordinates(location_input)
+# Get the local time (in decimal hours) from the location's time zone, daylight saving included
+local_hour = float(local_hours(time.time(), latitude, longitude))
 
 # Get Sun and Moon azimuth and altitude at the current local time
-sun_azimuth, sun_altitude, moon_azimuth, moon_altitude = get_sun_and_moon_positions(local_hour, latitude)
+sun_azimuth, sun_altitude, moon_azimuth, moon_altitude = sun_and_moon_positions(local_hour, latitude)
 
 # Calculate positions of Sun and Moon
 earth_radius = 6371  # Earth's radius in kilometers (scaled)
@@ -100,25 +45,27 @@ moon_x, moon_y, moon_z = calculate_position(moon_azimuth, moon_altitude, moon_di
 fig = plt.figure(figsize=(14, 12))  # Increase the figure size
 ax = fig.add_subplot(111, projection='3d')
 
+# The spheres share one cached unit mesh; its resolution follows each body's on-screen size
+scene_extent = 2 * max(abs(coordinate) for coordinate in (sun_x, sun_y, sun_z, moon_x, moon_y, moon_z, earth_size))
+
 # Plot Earth as a sphere at the bottom plane (z=0)
-u = np.linspace(0, 2 * np.pi, 100)
-v = np.linspace(0, np.pi, 100)
-x = earth_size * np.outer(np.cos(u), np.sin(v))
-y = earth_size * np.outer(np.sin(u), np.sin(v))
-z = earth_size * np.outer(np.ones(np.size(u)), np.cos(v))
-ax.plot_surface(x, y, z, color='g', rstride=5, cstride=5, alpha=0.6, label="Earth")
+plot_sphere(ax, (0, 0, 0), earth_size, extent=scene_extent, color='g', alpha=0.6, label="Earth")
 
 # Sun (large yellow sphere) above Earth
-x_sun = sun_size * np.outer(np.cos(u), np.sin(v))
-y_sun = sun_size * np.outer(np.sin(u), np.sin(v))
-z_sun = sun_size * np.outer(np.ones(np.size(u)), np.cos(v))
-ax.plot_surface(x_sun + sun_x, y_sun + sun_y, z_sun + sun_z, color='yellow', rstride=5, cstride=5, alpha=0.9, label="Sun")
+plot_sphere(ax, (sun_x, sun_y, sun_z), sun_size, extent=scene_extent, color='yellow', alpha=0.9, label="Sun")
 
 # Moon (smaller gray sphere) above Earth
-x_moon = moon_size * np.outer(np.cos(u), np.sin(v))
-y_moon = moon_size * np.outer(np.sin(u), np.sin(v))
-z_moon = moon_size * np.outer(np.ones(np.size(u)), np.cos(v))
-ax.plot_surface(x_moon + moon_x, y_moon + moon_y, z_moon + moon_z, color='gray', rstride=5, cstride=5, alpha=0.7, label="Moon")
+plot_sphere(ax, (moon_x, moon_y, moon_z), moon_size, extent=scene_extent, color='gray', alpha=0.7, label="Moon")
+
+# Planets in their real directions for this site and moment, all computed in one call.
+# They are drawn on the Sun's shell: their distances (0.3 to 31 AU) would not fit the scene
+planet_colors = {"mercury": "dimgray", "venus": "goldenrod", "mars": "orangered", "jupiter": "peru",
+                 "saturn": "khaki", "uranus": "lightseagreen", "neptune": "royalblue"}
+planet_azimuths, planet_altitudes = planet_altaz(time.time(), latitude, longitude)
+planet_x, planet_y, planet_z = calculate_position(planet_azimuths, planet_altitudes, sun_distance)
+ax.scatter(planet_x, planet_y, planet_z, s=40, c=[planet_colors[name] for name in PLANETS], depthshade=False, label="Planets")
+for name, x, y, z in zip(PLANETS, planet_x, planet_y, planet_z):
+    ax.text(x, y, z, f' {name.capitalize()}', color=planet_colors[name], fontsize=10)
 
 # Plot lines connecting Earth to Sun and Moon
 ax.plot([0, sun_x], [0, sun_y], [0, sun_z], 'r-', label="Earth-Sun line")
@@ -144,4 +91,4 @@ ax.set_zlabel('Z (Altitude)', fontsize=14)
 ax.set_title('Sun and Moon Simulation (Fixed Earth)', fontsize=16)
 
 # Show plot
-plt.show()
+rendering.show(fig)
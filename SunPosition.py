@@ -1,30 +1,11 @@
-import numpy as np
+import rendering
 import matplotlib.pyplot as plt
-from datetime import datetime
+import time
+from ephemeris import daily_sun_xy, daily_moon_xy
+from timescale import local_hours
 
-# Function to simulate Sun's position in Cartesian coordinates
-def sun_position(hour):
-    t = hour / 24 * 2 * np.pi  # Normalize hour to radians for smooth movement
-    
-    # Sun's path: cosine for east-west (x), sine for north-south (y)
-    x = np.cos(t)  # East-West movement
-    y = np.sin(t)  # North-South movement
-    
-    return x, y
-
-# Function to simulate Moon's position in Cartesian coordinates (simplified)
-def moon_position(hour):
-    t = hour / 24 * 2 * np.pi  # Normalize hour to radians for the Moon's movement
-    
-    # Moon's path: slower eastward movement
-    x = np.cos(t * 0.5)  # Moon moves eastward slower
-    y = np.sin(t * 0.5)  # Moon moves slightly up/down
-    
-    return x, y
-
-# Get the current time and extract the hour of the day
-current_time = datetime.now()
-current_hour = current_time.hour + current_time.minute / 60  # Get the current hour as a float
+# Current hour of the day (as a float) in the machine's time zone
+current_hour = float(local_hours(time.time()))
 
 # Setup a 2D grid plot with the Earth at origin (0,0)
 fig, ax = plt.subplots(figsize=(8, 8))
@@ -50,8 +31,8 @@ ax.plot([0, 0], [0, -1.5], 'k-', label="South (S)")  # S (negative y direction)
 ax.plot([0, 1], [0, -1], 'k--', label="Southeast (SE)")
 
 # Get Sun and Moon positions at the current time
-sun_x, sun_y = sun_position(current_hour)  # Get Sun's position for the current hour
-moon_x, moon_y = moon_position(current_hour)  # Get Moon's position for the current hour
+sun_x, sun_y = daily_sun_xy(current_hour)  # Get Sun's position for the current hour
+moon_x, moon_y = daily_moon_xy(current_hour)  # Get Moon's position for the current hour
 
 # Plot Sun's path (using current hour)
 ax.plot(sun_x, sun_y, 'ro', label=f"Sun at {current_hour:.2f}h")
@@ -63,4 +44,4 @@ ax.plot(moon_x, moon_y, 'bo', label=f"Moon at {current_hour:.2f}h")
 ax.legend()
 
 # Display the plot
-plt.show()
+rendering.show(fig)
@@ -0,0 +1,75 @@
+import argparse
+import time
+
+import numpy as np
+
+from ephemeris import ACCURACY_TIERS, sun_altaz, moon_altaz, to_epoch_seconds
+from table_io import read_chunks, open_writer
+
+# Accepted input column names
+LATITUDE_COLUMNS = ("lat", "latitude")
+LONGITUDE_COLUMNS = ("lon", "lng", "longitude")
+TIME_COLUMNS = ("time", "timestamp", "datetime", "epoch")
+
+# Find the first column of a chunk matching one of the accepted names
+def find_column(chunk, names):
+    for name in names:
+        if name in chunk:
+            return name
+    raise KeyError(f"Input needs one of the columns: {', '.join(names)}")
+
+# Timestamps may be epoch seconds or ISO 8601 strings in UTC
+def parse_times(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return to_epoch_seconds(values)
+    try:
+        return values.astype(np.float64)
+    except ValueError:
+        values = np.char.rstrip(values.astype(str), "Z")
+        return to_epoch_seconds(values.astype("datetime64[ms]"))
+
+# Add Sun and Moon azimuth/altitude columns to one chunk of rows
+def compute_chunk(chunk, accuracy="fast"):
+    latitude = np.asarray(chunk[find_column(chunk, LATITUDE_COLUMNS)], dtype=np.float64)
+    longitude = np.asarray(chunk[find_column(chunk, LONGITUDE_COLUMNS)], dtype=np.float64)
+    times = parse_times(chunk[find_column(chunk, TIME_COLUMNS)])
+
+    result = dict(chunk)
+    result["sun_azimuth"], result["sun_altitude"] = sun_altaz(times, latitude, longitude, accuracy)
+    result["moon_azimuth"], result["moon_altitude"] = moon_altaz(times, latitude, longitude, accuracy)
+    return result
+
+# Stream a table of (site, time) rows through the ephemeris, one chunk at a time
+def process_table(input_path, output_path, chunk_size=100000, progress=True, accuracy="fast"):
+    writer = open_writer(output_path)
+    rows = 0
+    start = time.perf_counter()
+    try:
+        for chunk in read_chunks(input_path, chunk_size):
+            result = compute_chunk(chunk, accuracy)
+            writer.write(result)
+            rows += len(result["sun_azimuth"])
+            if progress:
+                elapsed = time.perf_counter() - start
+                print(f"{rows} rows ({rows / elapsed:,.0f} rows/s)")
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    return rows, elapsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute Sun and Moon azimuth/altitude for a CSV, Parquet, Arrow or NDJSON table of (lat, lon, time) rows.")
+    parser.add_argument("input", help="Input .csv, .parquet, .arrow or .ndjson file")
+    parser.add_argument("output", help="Output .csv, .parquet, .arrow or .ndjson file")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="Rows held in memory at once")
+    parser.add_argument("--quiet", action="store_true", help="Only print the final summary")
+    parser.add_argument("--accuracy", choices=ACCURACY_TIERS, default="fast",
+                        help="precise adds the full lunar series, nutation, parallax and refraction (slower)")
+    args = parser.parse_args(argv)
+
+    rows, elapsed = process_table(args.input, args.output, args.chunk_size, progress=not args.quiet, accuracy=args.accuracy)
+    print(f"Processed {rows} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+if __name__ == "__main__":
+    main()
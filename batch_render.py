@@ -0,0 +1,86 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+
+import rendering
+from rendering import CHART_TYPES, DEFAULT_DPI, DEFAULT_OUTPUT_SIZE, parse_size
+
+# Parallel chart renderer for long location lists.
+# Each worker process builds one chart object at start-up and reuses it for every
+# location it is handed: geocoding, ephemeris and matplotlib rendering all run inside
+# the workers, so wall-clock time scales with the number of cores.
+
+_worker = {}
+
+# Runs once in every worker process
+def _init_worker(chart, output_dir, size, dpi):
+    matplotlib.use("Agg")
+    _worker.update(chart=chart, output_dir=output_dir, size=size, dpi=dpi,
+                   chart_object=rendering.make_chart(chart, size, dpi))
+
+def _render_one(location):
+    try:
+        result = rendering.render_location(_worker["chart_object"], _worker["chart"], location,
+                                           _worker["output_dir"], _worker["size"], _worker["dpi"])
+    except Exception as e:
+        return {"location": location, "error": str(e)}
+    if result is None:
+        return {"location": location, "error": "location not found"}
+    return result
+
+# Read one location per line, skipping blanks and # comments
+def read_locations(path):
+    with open(path, encoding="utf-8") as handle:
+        return [line.strip() for line in handle if line.strip() and not line.lstrip().startswith("#")]
+
+# Render every location on a pool of worker processes; returns the per-location results
+def render_in_pool(locations, output_dir, chart="annual", size=DEFAULT_OUTPUT_SIZE, dpi=DEFAULT_DPI,
+                   workers=None, chunksize=4, report=print, report_every=1):
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    results = []
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(chart, output_dir, size, dpi)) as pool:
+        for done, result in enumerate(pool.map(_render_one, locations, chunksize=chunksize), 1):
+            results.append(result)
+            if "error" in result:
+                report(f"[{done}/{len(locations)}] {result['location']}: {result['error']}")
+            elif done % report_every == 0 or done == len(locations):
+                elapsed = time.perf_counter() - started
+                remaining = elapsed / done * (len(locations) - done)
+                report(f"[{done}/{len(locations)}] {done / elapsed:.1f} charts/s, ETA {remaining:.0f}s")
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render charts for many locations in parallel.")
+    parser.add_argument("locations", nargs="*", help="Place names or 'latitude,longitude' pairs")
+    parser.add_argument("--file", help="Text file with one location per line")
+    parser.add_argument("--output-dir", default="charts")
+    parser.add_argument("--chart", choices=CHART_TYPES, default="annual")
+    parser.add_argument("--size", type=parse_size, default=DEFAULT_OUTPUT_SIZE, help="Output size in pixels, e.g. 1200x1200")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per core)")
+    parser.add_argument("--chunksize", type=int, default=4, help="Locations handed to a worker at a time")
+    parser.add_argument("--report-every", type=int, default=10, help="Print progress every N charts")
+    args = parser.parse_args(argv)
+
+    locations = list(args.locations)
+    if args.file:
+        locations += read_locations(args.file)
+    if not locations:
+        parser.error("no locations given")
+
+    started = time.perf_counter()
+    results = render_in_pool(locations, args.output_dir, args.chart, args.size, args.dpi,
+                             args.workers, args.chunksize, report_every=args.report_every)
+    elapsed = time.perf_counter() - started
+    failed = sum("error" in result for result in results)
+    print(f"Rendered {len(results) - failed} charts ({failed} failed) in {elapsed:.2f}s "
+          f"({(len(results) - failed) / elapsed:.1f} charts/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+import numpy as np
+
+# Benchmark suite for the ephemeris, geocoding and rendering hot paths.
+# Every measurement becomes one named metric with a unit and a direction
+# ("lower" or "higher" is better). Results are written as JSON, can be saved as a
+# baseline, and a later run compared against that baseline fails (exit status 1)
+# when any metric got worse by more than the tolerance.
+#
+# Groups: latency (per-call time of the scalar functions), throughput (rows/s against
+# array size), geocoding (memory / gazetteer / cache hits and misses against the local
+# mock server) and scripts (each chart script run headless: wall time and peak RSS).
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+GROUPS = ("latency", "throughput", "geocoding", "scripts")
+DEFAULT_BASELINE = os.path.join(REPO_DIR, "benchmark_baseline.json")
+DEFAULT_TOLERANCE = 0.25
+ARRAY_SIZES = (100, 10000, 1000000)
+SITE = (17.612778, 80.042167)
+T0 = 1731672000.0  # 2024-11-15 12:00 UTC
+YEAR_MINUTES = 366 * 1440
+
+# Chart scripts and the input they read; run headless at a small output size
+SCRIPTS = {
+    "2DPlotforyear": ("2DPlotforyear.py", "17.612778,80.042167\n"),
+    "2dKartheekaPournami": ("2dKartheekaPournami.py", "17.612778,80.042167\n"),
+    "3DFullMoonPaths": ("3DFullMoonPaths.py", ""),
+    "2Dpositions": ("2Dpositions.py", "17.612778,80.042167\n"),
+    "SunandMoon": ("SunandMoon.py", "17.612778,80.042167\n"),
+    "SunPosition": ("SunPosition.py", ""),
+    "FinalVersionWorking": ("FinalVersionWorking.py", "17.612778,80.042167\n"),
+}
+
+def metric(value, unit, better="lower"):
+    return {"value": float(value), "unit": unit, "better": better}
+
+# Median seconds per call, timeit-style (enough calls per repeat to last ~0.2 s)
+def seconds_per_call(function, repeat=5):
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return statistics.median(timer.repeat(repeat=repeat, number=number)) / number
+
+def bench_latency(quick=False):
+    from ephemeris import (sun_altaz, moon_altaz, planet_altaz, calculate_position, daily_sun_xy, daily_moon_xy,
+                           sun_and_moon_positions)
+
+    latitude, longitude = SITE
+    calls = {
+        "sun_altaz": lambda: sun_altaz(T0, latitude, longitude),
+        "moon_altaz": lambda: moon_altaz(T0, latitude, longitude),
+        "sun_altaz.precise": lambda: sun_altaz(T0, latitude, longitude, "precise"),
+        "moon_altaz.precise": lambda: moon_altaz(T0, latitude, longitude, "precise"),
+        "planet_altaz": lambda: planet_altaz(T0, latitude, longitude),
+        "calculate_position": lambda: calculate_position(120.0, 35.0, 1.0),
+        "daily_sun_xy": lambda: daily_sun_xy(12.5, latitude),
+        "daily_moon_xy": lambda: daily_moon_xy(12.5),
+        "sun_and_moon_positions": lambda: sun_and_moon_positions(12.5, latitude),
+    }
+    return {f"latency.{name}": metric(seconds_per_call(call, 3 if quick else 5) * 1e6, "us") for name, call in calls.items()}
+
+# Rows are timestamps for the Sun and Moon and (planet, timestamp) pairs for the planets
+def bench_throughput(quick=False):
+    from ephemeris import PLANETS, sun_altaz, moon_altaz, planet_altaz, calculate_position
+
+    latitude, longitude = SITE
+    results = {}
+    for size in ARRAY_SIZES[:-1] if quick else ARRAY_SIZES:
+        times = T0 + np.arange(size) * 60.0
+        cases = {
+            "sun_altaz": lambda: sun_altaz(times, latitude, longitude),
+            "moon_altaz": lambda: moon_altaz(times, latitude, longitude),
+            "sun_altaz.precise": lambda: sun_altaz(times, latitude, longitude, "precise"),
+            "moon_altaz.precise": lambda: moon_altaz(times, latitude, longitude, "precise"),
+            "calculate_position": lambda: calculate_position(times % 360, 35.0, 1.0),
+        }
+        for name, call in cases.items():
+            results[f"throughput.{name}.n{size}"] = metric(size / seconds_per_call(call, 3), "rows/s", "higher")
+        planets = lambda: planet_altaz(times, latitude, longitude)
+        results[f"throughput.planet_altaz.n{size}"] = metric(size * len(PLANETS) / seconds_per_call(planets, 3), "rows/s", "higher")
+    if not quick:
+        # All planets for every minute of a year, each tier in one call
+        times = T0 + np.arange(YEAR_MINUTES) * 60.0
+        for accuracy in ("fast", "precise"):
+            started = time.perf_counter()
+            planet_altaz(times, latitude, longitude, accuracy=accuracy)
+            results[f"throughput.planet_altaz.{accuracy}.year_minutes"] = metric(time.perf_counter() - started, "s")
+    return results
+
+def bench_geocoding(quick=False):
+    from geocoding import Geocoder, load_gazetteer
+    from mock_geocoder import start_server
+
+    results = {}
+    names = list(load_gazetteer())[:50]
+    server = start_server()
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, "geocode.sqlite3")
+        online = Geocoder(cache_path=cache_path, gazetteer_path=None, nominatim_url=server.url)
+
+        # Misses: every name goes to the (local) network, then lands in the cache
+        started = time.perf_counter()
+        for name in names:
+            online.lookup(name)
+        results["geocoding.network_miss"] = metric((time.perf_counter() - started) / len(names) * 1000, "ms")
+
+        # Cache hits from SQLite with an empty memory layer, then memory hits
+        cached = Geocoder(cache_path=cache_path, gazetteer_path=None, online=False)
+        started = time.perf_counter()
+        for name in names:
+            cached.lookup(name)
+        results["geocoding.cache_hit"] = metric((time.perf_counter() - started) / len(names) * 1e6, "us")
+        results["geocoding.memory_hit"] = metric(seconds_per_call(lambda: cached.lookup(names[0]), 3) * 1e6, "us")
+        cached.cache.close()
+        online.cache.close()
+
+    gazetteer = Geocoder(cache_path=None, online=False)
+    started = time.perf_counter()
+    for name in names:
+        gazetteer.lookup(name)
+    results["geocoding.gazetteer_hit"] = metric((time.perf_counter() - started) / len(names) * 1e6, "us")
+    server.shutdown()
+    return results
+
+# Runs a script and reports its own peak RSS on stderr. The child measures itself
+# because on Linux the rusage of a forked child starts from the parent's high-water mark.
+CHILD_CODE = """import runpy, sys, os
+path = sys.argv[1]
+sys.argv = [path]
+sys.path.insert(0, os.path.dirname(path))
+try:
+    runpy.run_path(path, run_name="__main__")
+finally:
+    try:
+        with open("/proc/self/status") as status:
+            peak = next(int(line.split()[1]) / 1024 for line in status if line.startswith("VmHWM:"))
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    sys.stderr.write(f"\\nPEAK_RSS_MB={peak}\\n")
+"""
+
+# Run one script in a fresh interpreter; returns (wall seconds, peak RSS in MB)
+def run_script(path, stdin_text, workdir, env):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", CHILD_CODE, os.path.join(REPO_DIR, path)], cwd=workdir, env=env,
+                            input=stdin_text, text=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"{path} failed: {result.stderr[-500:]}")
+    peak = float(result.stderr.rsplit("PEAK_RSS_MB=", 1)[1])
+    return elapsed, peak
+
+def bench_scripts(quick=False, size="800x800"):
+    results = {}
+    env = dict(os.environ, SOLARSYSTEM_HEADLESS="1", SOLARSYSTEM_OUTPUT_SIZE=size, SOLARSYSTEM_GEOCODER="offline",
+               MPLBACKEND="Agg")
+    scripts = dict(list(SCRIPTS.items())[:2]) if quick else SCRIPTS
+    runs = 1 if quick else 3  # A single start-up is noisy; the median of three is steadier
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, (path, stdin_text) in scripts.items():
+            elapsed, peak = zip(*(run_script(path, stdin_text, workdir, env) for _ in range(runs)))
+            results[f"scripts.{name}.seconds"] = metric(statistics.median(elapsed), "s")
+            results[f"scripts.{name}.peak_rss"] = metric(max(peak), "MB")
+    return results
+
+BENCHMARKS = {"latency": bench_latency, "throughput": bench_throughput, "geocoding": bench_geocoding, "scripts": bench_scripts}
+
+def environment():
+    import matplotlib
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "commit": commit,
+            "python": platform.python_version(), "numpy": np.__version__, "matplotlib": matplotlib.__version__,
+            "platform": platform.platform(), "cpus": os.cpu_count()}
+
+def run(groups=GROUPS, quick=False, report=print):
+    results = {}
+    for group in groups:
+        started = time.perf_counter()
+        results.update(BENCHMARKS[group](quick))
+        report(f"{group}: done in {time.perf_counter() - started:.1f}s")
+    return {"environment": environment(), "results": results}
+
+# Metrics that got worse than the baseline by more than `tolerance` (a fraction)
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    regressions = []
+    for name, old in baseline["results"].items():
+        new = current["results"].get(name)
+        if new is None or old["value"] == 0:
+            continue
+        change = (new["value"] - old["value"]) / abs(old["value"])
+        worse = change > tolerance if old["better"] == "lower" else change < -tolerance
+        if worse:
+            regressions.append((name, old["value"], new["value"], change, old["unit"]))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the ephemeris, geocoding and rendering hot paths.")
+    parser.add_argument("--group", action="append", choices=GROUPS, help="Only run these groups (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes and fewer scripts, for a fast check")
+    parser.add_argument("--output", help="Write the results JSON here")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, metavar="PATH",
+                        help="Store the results as the baseline")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, metavar="PATH",
+                        help="Compare against a stored baseline and exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown as a fraction (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    current = run(args.group or GROUPS, args.quick)
+    for name, result in current["results"].items():
+        print(f"{name:45} {result['value']:14,.3f} {result['unit']}")
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as handle:
+                json.dump(current, handle, indent=2)
+            print(f"Wrote {path}")
+
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+        regressions = compare(current, baseline, args.tolerance)
+        for name, old, new, change, unit in regressions:
+            print(f"REGRESSION {name}: {old:,.3f} -> {new:,.3f} {unit} ({change:+.0%})")
+        if regressions:
+            raise SystemExit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.compare} ({baseline['environment'].get('commit', '?')})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import time
+from urllib.parse import urlencode, urlsplit
+
+from geocoding import USER_AGENT, Geocoder, normalize_name, parse_coordinates
+
+# Asynchronous bulk geocoding for long place-name lists.
+# Names are deduplicated by their normalized key and everything already known
+# (memory, gazetteer, SQLite cache) is answered offline. The remaining keys go to a
+# pool of asyncio workers that share a token-bucket rate limiter, retry failed
+# requests with exponential backoff, and write answers to the geocoder's SQLite cache
+# in small transactions as they arrive, so an interrupted run resumes where it stopped.
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org"
+NOMINATIM_RATE = 1.0  # Requests per second allowed by the public Nominatim usage policy
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class GeocodeHTTPError(Exception):
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+# Token bucket: `rate` tokens per second, at most `capacity` saved up for bursts
+class TokenBucket:
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.rate:
+            return
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+# Minimal asynchronous HTTP GET returning parsed JSON (HTTP/1.0, so the body ends at EOF)
+async def fetch_json(url, timeout=10):
+    parts = urlsplit(url)
+    https = parts.scheme == "https"
+    port = parts.port or (443 if https else 80)
+    path = parts.path + ("?" + parts.query if parts.query else "")
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(parts.hostname, port, ssl=True if https else None), timeout)
+    try:
+        writer.write(f"GET {path} HTTP/1.0\r\nHost: {parts.hostname}\r\nUser-Agent: {USER_AGENT}\r\n"
+                     f"Accept: application/json\r\nConnection: close\r\n\r\n".encode("ascii"))
+        response = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    if not response:
+        raise ConnectionError("Empty HTTP response")  # An OSError, so it is retried
+    head, _, body = response.partition(b"\r\n\r\n")
+    lines = head.decode("iso-8859-1").split("\r\n")
+    status_line = lines[0].split()
+    if len(status_line) < 2 or not status_line[0].startswith("HTTP/") or not status_line[1].isdigit():
+        raise ValueError(f"Malformed HTTP status line {lines[0][:80]!r}")
+    status = int(status_line[1])
+    headers = {name.strip().lower(): value.strip() for name, _, value in (line.partition(":") for line in lines[1:])}
+    if status != 200:
+        retry_after = headers.get("retry-after")
+        raise GeocodeHTTPError(status, float(retry_after) if retry_after and retry_after.isdigit() else None)
+    return json.loads(body)
+
+# (lat, lon) of the first hit of a Nominatim search response, (None, None) without hits
+def first_result(results):
+    if not isinstance(results, list):
+        raise ValueError(f"Expected a JSON list of results, got {type(results).__name__}")
+    if not results:
+        return None, None
+    if not isinstance(results[0], dict) or "lat" not in results[0] or "lon" not in results[0]:
+        raise ValueError("Search result without lat/lon")
+    return float(results[0]["lat"]), float(results[0]["lon"])
+
+class BulkGeocoder:
+    def __init__(self, geocoder, base_url=NOMINATIM_URL, concurrency=8, rate=NOMINATIM_RATE, burst=1,
+                 retries=4, backoff=0.5, timeout=10, commit_every=50):
+        self.geocoder = geocoder
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.commit_every = commit_every
+        self.pending = []
+        self.stats = {"names": 0, "unique": 0, "offline": 0, "requests": 0, "retries": 0,
+                      "found": 0, "not_found": 0, "errors": 0}
+
+    # Query Nominatim for one name, retrying transient failures with exponential backoff
+    async def query(self, name, bucket):
+        for attempt in range(self.retries + 1):
+            await bucket.acquire()
+            self.stats["requests"] += 1
+            try:
+                results = await fetch_json(f"{self.base_url}/search?{urlencode({'q': name, 'format': 'json', 'limit': 1})}", self.timeout)
+            except GeocodeHTTPError as e:
+                if e.status not in RETRY_STATUSES or attempt == self.retries:
+                    raise
+                delay = e.retry_after if e.retry_after is not None else self.backoff * 2 ** attempt
+            except (OSError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * 2 ** attempt
+            else:
+                return first_result(results)
+            self.stats["retries"] += 1
+            await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+
+    # Remember an answer; answers reach the SQLite cache in batches of commit_every. A miss
+    # from another server (a mock, a private instance) says nothing about the public one,
+    # so it is only kept in memory.
+    def store(self, key, result):
+        self.geocoder.memory[key] = result
+        if result[0] is None and self.base_url != NOMINATIM_URL:
+            return
+        self.pending.append((key, result[0], result[1], "nominatim"))
+        if len(self.pending) >= self.commit_every:
+            self.flush()
+
+    def flush(self):
+        if self.pending and self.geocoder.cache is not None:
+            self.geocoder.cache.put_many(self.pending)
+        self.pending = []
+
+    async def worker(self, queue, bucket, answers, progress):
+        while True:
+            key, name = await queue.get()
+            try:
+                result = await self.query(name, bucket)
+            except Exception as e:  # Recorded for this name; anything escaping would stop the worker
+                answers[key] = e
+                self.stats["errors"] += 1
+            else:
+                answers[key] = result
+                self.store(key, result)
+            finally:
+                queue.task_done()  # Always, or geocode_all's queue.join() would wait forever
+            if progress:
+                progress(len(answers))
+
+    # Geocode every name; returns a list aligned with `names` of (lat, lon), (None, None)
+    # when not found, or the exception for names that kept failing
+    async def geocode_all(self, names, progress=None):
+        started = time.perf_counter()
+        keys = {}
+        for name in names:
+            keys.setdefault(normalize_name(name), name)
+        self.stats.update(names=len(names), unique=len(keys))
+
+        answers = {}
+        queue = asyncio.Queue()
+        for key, name in keys.items():
+            try:
+                coordinates = parse_coordinates(name)
+            except ValueError as e:
+                answers[key] = e
+                self.stats["errors"] += 1
+                continue
+            known = coordinates if coordinates is not None else self.geocoder.lookup_offline(key)
+            if known is None:
+                queue.put_nowait((key, name))
+            else:
+                answers[key] = known
+                self.stats["offline"] += 1
+
+        bucket = TokenBucket(self.rate, self.burst)
+        workers = [asyncio.create_task(self.worker(queue, bucket, answers, progress)) for _ in range(self.concurrency)]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self.flush()
+
+        for answer in answers.values():
+            if isinstance(answer, tuple):
+                self.stats["found" if answer[0] is not None else "not_found"] += 1
+        elapsed = time.perf_counter() - started
+        self.stats.update(elapsed=elapsed, names_per_second=len(names) / max(elapsed, 1e-9),
+                          hit_rate=self.stats["offline"] / max(len(keys), 1))
+        return [answers[normalize_name(name)] for name in names]
+
+# Synchronous entry point; returns (results, stats)
+def bulk_geocode(names, geocoder=None, progress=None, **options):
+    bulk = BulkGeocoder(geocoder or Geocoder(), **options)
+    results = asyncio.run(bulk.geocode_all(names, progress))
+    return results, bulk.stats
+
+# Place names from a text file (one per line, # comments) or a CSV column
+def read_names(path, column=None):
+    with open(path, newline="", encoding="utf-8") as handle:
+        if path.lower().endswith(".csv"):
+            rows = csv.DictReader(handle)
+            column = column or rows.fieldnames[0]
+            return [row[column].strip() for row in rows if row[column].strip()]
+        return [line.strip() for line in handle if line.strip() and not line.lstrip().startswith("#")]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Geocode a long list of place names concurrently with rate limiting and a resumable cache.")
+    parser.add_argument("input", help="Text file with one name per line, or a CSV file")
+    parser.add_argument("--column", help="CSV column holding the names (default: the first)")
+    parser.add_argument("--output", help="Write name,latitude,longitude rows to this CSV")
+    parser.add_argument("--url", default=os.environ.get("SOLARSYSTEM_NOMINATIM_URL", NOMINATIM_URL), help="Nominatim-compatible server")
+    parser.add_argument("--cache", default=None, help="SQLite cache file (default: the shared geocoder cache; in memory with --mock)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=None,
+                        help=f"Requests per second (default {NOMINATIM_RATE} for the public server, unlimited otherwise; 0 = unlimited)")
+    parser.add_argument("--burst", type=int, default=1, help="Requests allowed back to back")
+    parser.add_argument("--retries", type=int, default=4)
+    parser.add_argument("--mock", action="store_true", help="Start a local mock server and geocode against it")
+    parser.add_argument("--mock-delay", type=float, default=0.05, help="Mock server latency per request (seconds)")
+    parser.add_argument("--mock-fail-rate", type=float, default=0.0, help="Fraction of mock requests answered with 503")
+    args = parser.parse_args(argv)
+
+    names = read_names(args.input, args.column)
+    url = args.url
+    if args.mock:
+        from mock_geocoder import start_server
+
+        server = start_server(delay=args.mock_delay, fail_rate=args.mock_fail_rate)
+        url = server.url
+    rate = args.rate if args.rate is not None else (NOMINATIM_RATE if url.rstrip("/") == NOMINATIM_URL else 0)
+
+    # With --mock, skip the gazetteer so every name exercises the network path, and keep the
+    # mock's answers out of the shared cache
+    options = {"gazetteer_path": None, "cache_path": ":memory:"} if args.mock else {}
+    if args.cache:
+        options["cache_path"] = args.cache
+    geocoder = Geocoder(**options)
+    results, stats = bulk_geocode(names, geocoder, base_url=url, concurrency=args.concurrency, rate=rate,
+                                  burst=args.burst, retries=args.retries)
+
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["name", "latitude", "longitude"])
+            for name, result in zip(names, results):
+                writer.writerow([name] + (list(result) if isinstance(result, tuple) else [None, None]))
+    print(", ".join(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}" for key, value in stats.items()))
+
+if __name__ == "__main__":
+    main()
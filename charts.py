@@ -0,0 +1,201 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.colors import Normalize
+from matplotlib.lines import Line2D
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+from ephemeris import annual_sun_xy, annual_moon_xy, annual_moon_xyz, day_of_year
+from decimation import plot_decimated, simplify_segments3d
+from instrumentation import span
+from lunar_phases import full_moons, nearest_phase
+
+# Reusable chart objects. Each chart builds its figure, axes and artists once;
+# draw() only updates their data, so many locations can be rendered with the same
+# figure. Connector lines and paths are batched into a single collection each and
+# labels come from a pool of reused Text artists, so draw time stays flat as the
+# number of annotations grows.
+
+DAYS = np.arange(1, 366)  # 1 to 365 for a year
+ANNOTATE_EVERY = 15  # Draw Sun-Moon lines and day labels every 15 days
+MAX_LABELS = 60  # Per body; denser label requests are thinned to keep charts legible
+
+CHART_YEAR = 2024  # Year whose real full moons are drawn
+
+# 15th November 2024 (Kartheeka Pournami)
+KARTHEEKA_POURNAMI_DATE = datetime(2024, 11, 15, tzinfo=timezone.utc)
+
+# Instant (epoch seconds, UTC) of the full moon of Kartheeka Pournami
+def kartheeka_pournami():
+    return nearest_phase(KARTHEEKA_POURNAMI_DATE, "full")
+
+# Plot the Earth at the origin and the cardinal directions
+def draw_compass(ax, extent=1.5):
+    ax.plot(0, 0, 'go', label="Earth (Origin)", markersize=10)
+    ax.plot([0, extent], [0, 0], 'k-', label="East (E)")
+    ax.plot([0, -extent], [0, 0], 'k-', label="West (W)")
+    ax.plot([0, 0], [0, extent], 'k-', label="North (N)")
+    ax.plot([0, 0], [0, -extent], 'k-', label="South (S)")
+
+# Pool of Text artists that are moved and relabelled instead of recreated on every draw
+class TextPool:
+    def __init__(self, ax, **style):
+        self.ax = ax
+        self.style = style
+        self.texts = []
+
+    def update(self, labels, x, y, z=None):
+        while len(self.texts) < len(labels):
+            if z is None:
+                self.texts.append(self.ax.text(0, 0, "", **self.style))
+            else:
+                self.texts.append(self.ax.text(0, 0, 0, "", **self.style))
+        for index, (text, label) in enumerate(zip(self.texts, labels)):
+            if z is None:
+                text.set_position((x[index], y[index]))
+            else:
+                text.set_position_3d((x[index], y[index], z[index]))
+            text.set_text(label)
+            text.set_visible(True)
+        for text in self.texts[len(labels):]:
+            text.set_visible(False)
+
+# Stride that keeps at most MAX_LABELS labels on a path
+def label_stride(count):
+    return max(1, int(np.ceil(count / MAX_LABELS)))
+
+# Sun and Moon annual paths (2DPlotforyear.py / 2dKartheekaPournami.py)
+class AnnualPathsChart:
+    def __init__(self, figsize=(10, 10), moon_hour=0):
+        self.moon_hour = moon_hour
+        self.fig, self.ax = plt.subplots(figsize=figsize)
+        ax = self.ax
+        ax.set_xlim(-1.5, 1.5)
+        ax.set_ylim(-1.5, 1.5)
+        ax.set_aspect('equal', 'box')
+        ax.set_xlabel("East-West (x-axis)")
+        ax.set_ylabel("North-South (y-axis)")
+
+        # Lines between Sun and Moon, colored by day of the year
+        self.connectors = LineCollection([], cmap=plt.cm.viridis, norm=Normalize(0, 1), linewidths=1)
+        ax.add_collection(self.connectors)
+        # Path lines are decimated to the output resolution when drawn (decimation.py)
+        self.sun_line = plot_decimated(ax, [], [], color='r', linestyle='-', label="Sun's Path (Annual)")
+        self.moon_line = plot_decimated(ax, [], [], color='b', linestyle='-', label="Moon's Path (Annual)")
+        draw_compass(ax)
+        ax.legend()
+
+        self.sun_labels = TextPool(ax, color="red", fontsize=8, ha='center')
+        self.moon_labels = TextPool(ax, color="blue", fontsize=8, ha='center')
+        self.highlight_line = plot_decimated(ax, [], [], color='k', linestyle='-', lw=2, visible=False)
+        self.highlight_text = ax.text(0, 0, "", color="orange", fontsize=12, ha='center', visible=False)
+
+    def draw(self, latitude, location_label, days=DAYS, connect_every=ANNOTATE_EVERY, label_every=ANNOTATE_EVERY):
+        # Compute the whole period's paths in one vectorized call
+        with span("compute"):
+            sun_path_x, sun_path_y = annual_sun_xy(days, latitude)  # Positions at noon for each day
+            moon_path_x, moon_path_y = annual_moon_xy(days, self.moon_hour)
+        with span("plot"):
+            self._update_artists(days, location_label, sun_path_x, sun_path_y, moon_path_x, moon_path_y,
+                                 connect_every, label_every)
+
+    # Point the existing artists at freshly computed paths
+    def _update_artists(self, days, location_label, sun_path_x, sun_path_y, moon_path_x, moon_path_y,
+                        connect_every, label_every):
+        self.ax.set_title(f"Sun and Moon Annual Paths (Location: {location_label})")
+        self.highlight_line.set_visible(False)
+        self.highlight_text.set_visible(False)
+        self.sun_line.set_data(sun_path_x, sun_path_y)
+        self.moon_line.set_data(moon_path_x, moon_path_y)
+
+        # All Sun-Moon lines go into one collection
+        connected = days % connect_every == 0
+        segments = np.stack([
+            np.column_stack([sun_path_x[connected], sun_path_y[connected]]),
+            np.column_stack([moon_path_x[connected], moon_path_y[connected]]),
+        ], axis=1)
+        self.connectors.set_segments(segments)
+        self.connectors.set_array(((days[connected] - 1) % 365 + 1) / 365)  # Color by the day of the year
+
+        # Day labels, thinned when the chart is dense
+        labelled = np.flatnonzero(days % label_every == 0)
+        labelled = labelled[::label_stride(len(labelled))]
+        labels = [str(day) for day in days[labelled]]
+        self.sun_labels.update(labels, sun_path_x[labelled] + 0.03, sun_path_y[labelled] + 0.05)
+        self.moon_labels.update(labels, moon_path_x[labelled], moon_path_y[labelled] + 0.05)
+
+    # Show the Moon's 24-hour path for one day with a label at midnight
+    def highlight_moon_day(self, day, label, line_label=None):
+        moon_x, moon_y = annual_moon_xy(day, np.arange(24))
+        self.highlight_line.set_data(moon_x, moon_y)
+        self.highlight_line.set_label(line_label)
+        self.highlight_line.set_visible(True)
+        self.highlight_text.set_position((moon_x[0] + 0.05, moon_y[0] + 0.05))
+        self.highlight_text.set_text(label)
+        self.highlight_text.set_visible(True)
+
+    # Highlight the day of the Kartheeka Pournami full moon, labelled with its time
+    def highlight_kartheeka_pournami(self):
+        full_moon = kartheeka_pournami()
+        label = f"Kartheeka Pournami ({datetime.fromtimestamp(full_moon, timezone.utc):%H:%M} UTC)"
+        self.highlight_moon_day(int(day_of_year(full_moon)), label, "Moon's Path on 15th Nov 2024")
+
+# Moon's paths on the full moon days of the year in 3D (3DFullMoonPaths.py)
+class FullMoonPathsChart:
+    def __init__(self, figsize=(10, 10)):
+        self.fig = plt.figure(figsize=figsize)
+        self.ax = ax = self.fig.add_subplot(111, projection='3d')
+        ax.set_xlim(-1.5, 1.5)
+        ax.set_ylim(-1.5, 1.5)
+        ax.set_zlim(-0.5, 0.5)
+        ax.set_xlabel("East-West (x-axis)")
+        ax.set_ylabel("North-South (y-axis)")
+        ax.set_zlabel("Up-Down (z-axis)")
+
+        # All full-moon paths share one collection
+        self.paths = Line3DCollection([], linewidths=3)
+        ax.add_collection3d(self.paths, autolim=False)
+        self.day_labels = TextPool(ax, color="black", fontsize=8, ha='center')
+        self.highlight_label = ax.text(0, 0, 0, "Kartheeka Pournami", color="red", fontsize=12, ha='center', visible=False)
+
+        # Plot the Earth at the origin (0, 0, 0)
+        self.earth = ax.scatter(0, 0, 0, color='green', s=100, label="Earth (Origin)")
+
+    def draw(self, latitude, longitude, location_label="Home"):
+        with span("compute"):
+            # The year's real full moons (12 or 13), found by the lunar phase search
+            full_moon_days = day_of_year(full_moons(CHART_YEAR)).astype(int)
+            kartheeka_day = int(day_of_year(kartheeka_pournami()))
+            hours = np.arange(24)  # The 24 hours of each full moon day (00:00 to 23:00)
+
+            # Compute all full-moon days x 24 hours of Moon positions in one broadcast call
+            paths_x, paths_y, paths_z = annual_moon_xyz(full_moon_days[:, np.newaxis], hours[np.newaxis, :])
+        with span("plot"):
+            self._update_artists(latitude, longitude, location_label, full_moon_days, kartheeka_day, paths_x, paths_y, paths_z)
+
+    # Point the existing artists at freshly computed paths
+    def _update_artists(self, latitude, longitude, location_label, full_moon_days, kartheeka_day, paths_x, paths_y, paths_z):
+        ax = self.ax
+        ax.set_title(f"Full Moon Paths in 3D (Location: {location_label} - {latitude}, {longitude})")
+        self.paths.set_segments(simplify_segments3d(ax, np.stack([paths_x, paths_y, paths_z], axis=-1)))
+
+        # The full moon on November 15th (Kartheeka Pournami) gets a special color (red)
+        kartheeka = full_moon_days == kartheeka_day
+        self.paths.set_color([(1, 0, 0) if special else (0.1, 0.1, 0.1) for special in kartheeka])
+
+        # Label each path at noon; the Kartheeka Pournami path gets its own label
+        noon_x, noon_y, noon_z = paths_x[:, 12] + 0.05, paths_y[:, 12] + 0.05, paths_z[:, 12]
+        ordinary = ~kartheeka
+        self.day_labels.update([str(day) for day in full_moon_days[ordinary]], noon_x[ordinary], noon_y[ordinary], noon_z[ordinary])
+        self.highlight_label.set_visible(bool(kartheeka.any()))
+        if kartheeka.any():
+            index = np.flatnonzero(kartheeka)[0]
+            self.highlight_label.set_position_3d((noon_x[index], noon_y[index], noon_z[index]))
+
+        # Legend entries for the batched paths
+        handles = [Line2D([], [], color=(0.1, 0.1, 0.1), lw=3, label="Full Moon paths (labelled by day)")]
+        if kartheeka.any():
+            handles.insert(0, Line2D([], [], color='red', lw=3, label="Kartheeka Pournami (Nov 15, 2024)"))
+        ax.legend(handles=handles + [self.earth])
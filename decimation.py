@@ -0,0 +1,199 @@
+import os
+
+import numpy as np
+from matplotlib.lines import Line2D
+
+# Level-of-detail decimation for dense line plots: a DecimatedLine keeps the full data and
+# draws only the vertices that can be told apart at the current view and pixel size.
+# SOLARSYSTEM_LOD_TOLERANCE sets the allowed error in pixels (default 0.25; 0 disables it).
+
+DEFAULT_TOLERANCE = float(os.environ.get("SOLARSYSTEM_LOD_TOLERANCE", "0.25"))
+VIEW_MARGIN = 0.05  # Fraction of the axes size kept around the view before culling
+SIMPLIFY_CHUNK = 1 << 20  # Points simplified at a time, bounding the temporaries
+PIECE_POINTS = 128  # Paths are simplified in pieces this long, so looping tracks need few levels
+MIN_POINTS = 1000  # Lines this short are drawn as they are
+
+# Indices of the first, last, lowest and highest point of each pixel column, for x
+# ascending; `x_range` is the visible (x0, x1) spread over `pixels` columns
+def minmax_indices(x, y, x_range, pixels):
+    first = max(int(np.searchsorted(x, x_range[0], side="left")) - 1, 0)
+    last = min(int(np.searchsorted(x, x_range[1], side="right")) + 1, len(x))
+    if last - first <= 4 * pixels:
+        return np.arange(first, last)
+    x, y = x[first:last], y[first:last]
+    columns = np.clip(((x - x_range[0]) / (x_range[1] - x_range[0]) * pixels).astype(np.int64), -1, pixels)
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(columns)) + 1])
+    counts = np.diff(np.append(starts, len(x)))
+    index = np.arange(len(x))
+    lowest = np.fmin.reduceat(y, starts)
+    highest = np.fmax.reduceat(y, starts)
+    # The earliest index holding each column's extreme
+    low_index = np.minimum.reduceat(np.where(y == np.repeat(lowest, counts), index, len(x)), starts)
+    high_index = np.minimum.reduceat(np.where(y == np.repeat(highest, counts), index, len(x)), starts)
+    kept = np.concatenate([starts, starts + counts - 1, low_index, high_index])
+    return first + np.unique(kept[kept < len(x)])
+
+# Douglas-Peucker ranks over the pieces [starts[i], ends[i]] of an (n, d) point array: the
+# largest tolerance at which each point is still kept (inf for piece ends, 0 for points
+# never needed). A point's rank is its distance from the chord it splits, capped by the
+# rank of the split above it, so the points ranked above any tolerance are exactly the
+# Douglas-Peucker simplification at that tolerance. Segments within `stop` are not split.
+# Ranks are computed once per data set, so a new view only thresholds them. All pending
+# segments are split together breadth-first (a few array operations per level instead of
+# a recursion per segment), and path_ranks starts from short pieces: on a track looping
+# hundreds of times, one chord over the whole path would take a level per loop.
+def split_ranks(points, starts=None, ends=None, stop=0.0):
+    points = np.asarray(points, dtype=np.float64)
+    count = len(points)
+    if starts is None:
+        starts, ends = np.array([0]), np.array([count - 1])
+    ranks = np.zeros(count)
+    ranks[starts] = ranks[ends] = np.inf
+    coordinates = [np.ascontiguousarray(points[:, axis]) for axis in range(points.shape[1])]
+    starts, ends = np.asarray(starts), np.asarray(ends)
+    bounds = np.full(len(starts), np.inf)
+    stop2 = stop * stop
+    while len(starts):
+        interior = ends - starts - 1
+        active = interior > 0
+        starts, ends, bounds, interior = starts[active], ends[active], bounds[active], interior[active]
+        if not len(starts):
+            break
+        offsets = np.cumsum(interior) - interior
+        segment = np.repeat(np.arange(len(starts)), interior)
+        index = np.arange(interior.sum()) - offsets[segment] + starts[segment] + 1
+        # Squared distance of every interior point from its piece's chord (as a segment)
+        offset = [values[index] - values[starts][segment] for values in coordinates]
+        chord = [values[ends] - values[starts] for values in coordinates]
+        length2 = sum(c * c for c in chord)
+        along = sum(o * c[segment] for o, c in zip(offset, chord)) / np.where(length2 > 0, length2, 1)[segment]
+        np.clip(along, 0, 1, out=along)
+        distance2 = sum((o - along * c[segment]) ** 2 for o, c in zip(offset, chord))
+        farthest = np.maximum.reduceat(distance2, offsets)
+        far = farthest > stop2
+        if not far.any():
+            break
+        split = np.minimum.reduceat(np.where(distance2 == farthest[segment], index, count), offsets)[far]
+        bounds = np.minimum(bounds[far], np.sqrt(farthest[far]))
+        ranks[split] = bounds
+        starts, ends, bounds = np.concatenate([starts[far], split]), np.concatenate([split, ends[far]]), np.tile(bounds, 2)
+    return ranks
+
+# Douglas-Peucker: indices of the points to keep so that no dropped point is farther than
+# `tolerance` from the result
+def simplify_indices(points, tolerance, starts=None, ends=None):
+    return np.flatnonzero(split_ranks(points, starts, ends, tolerance) > tolerance)
+
+# Pieces of at most PIECE_POINTS points that stay within one group (`groups` holds each
+# point's group number, ascending); neighbouring pieces share their end point:
+# (piece starts, piece ends)
+def _pieces(groups):
+    breaks = np.flatnonzero(np.diff(groups))
+    run_starts = np.concatenate([[0], breaks + 1])
+    run_ends = np.concatenate([breaks, [len(groups) - 1]])
+    lengths = np.maximum(-(-(run_ends - run_starts) // PIECE_POINTS), 1)
+    run = np.repeat(np.arange(len(run_starts)), lengths)
+    starts = run_starts[run] + (np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)) * PIECE_POINTS
+    return starts, np.minimum(starts + PIECE_POINTS, run_ends[run])
+
+# Split ranks (data units) of a whole 2D path; NaN points break the path and are always kept
+def path_ranks(x, y):
+    points = np.column_stack([np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)])
+    broken = ~np.isfinite(points).all(axis=1)
+    groups = np.cumsum(broken | np.concatenate([[False], broken[:-1]]))
+    ranks = []
+    for first in range(0, len(points), SIMPLIFY_CHUNK):
+        chunk = slice(first, min(first + SIMPLIFY_CHUNK + 1, len(points)))  # Chunks share their end point
+        ranks.append(split_ranks(points[chunk], *_pieces(groups[chunk]))[:SIMPLIFY_CHUNK])
+    ranks = np.concatenate(ranks)
+    ranks[broken] = np.inf
+    return ranks
+
+# Decimated (x, y) of a path for an axes' current view and pixel size; `ranks` are the
+# path's split_ranks, computed here when not given. Culled gaps become NaN breaks so
+# separate visible stretches are not joined; where a line enters the view the error can
+# reach twice the tolerance. Time series (`ascending` x) use minmax_indices instead.
+def decimate_path(ax, x, y, tolerance=DEFAULT_TOLERANCE, ascending=False, ranks=None):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if tolerance <= 0 or len(x) < MIN_POINTS:
+        return x, y
+    (x0, y0), (x1, y1) = ax.viewLim.get_points()
+    if ax.get_xscale() != "linear" or ax.get_yscale() != "linear":
+        return x, y
+    if ascending:
+        kept = minmax_indices(x, y, (x0, x1), max(1, int(np.ceil(ax.bbox.width / max(tolerance, 0.5)))))
+        return x[kept], y[kept]
+    if ranks is None:
+        ranks = path_ranks(x, y)
+
+    # Cull to the view plus a margin, keeping each visible stretch's outside neighbours
+    margin_x, margin_y = (x1 - x0) * VIEW_MARGIN, (y1 - y0) * VIEW_MARGIN
+    visible = (x >= x0 - margin_x) & (x <= x1 + margin_x) & (y >= y0 - margin_y) & (y <= y1 + margin_y)
+    visible[:-1] |= visible[1:]
+    visible[1:] |= visible[:-1]
+    ends = visible & ~(np.concatenate([[False], visible[:-1]]) & np.concatenate([visible[1:], [False]]))
+    # Pixels per data unit along the more stretched axis, so data-space ranks bound pixel error
+    scale = max(ax.bbox.width / abs(x1 - x0), ax.bbox.height / abs(y1 - y0))
+    kept = np.flatnonzero(visible & ((ranks > tolerance / scale) | ends))
+    x_kept, y_kept = x[kept], y[kept]
+    hidden = np.cumsum(~visible)[kept]
+    gaps = np.flatnonzero(np.diff(hidden)) + 1
+    if len(gaps):
+        x_kept, y_kept = np.insert(x_kept, gaps, np.nan), np.insert(y_kept, gaps, np.nan)
+    return x_kept, y_kept
+
+# A Line2D that stores full-resolution data and draws a decimated copy matched to the
+# current view; set_data() takes the full data, get_full_data() returns it
+class DecimatedLine(Line2D):
+    def __init__(self, xdata, ydata, tolerance=DEFAULT_TOLERANCE, **kwargs):
+        self.tolerance = tolerance
+        self._full = (np.asarray(xdata), np.asarray(ydata))
+        self._ascending = False
+        self._ranks = None
+        self._view_key = None
+        super().__init__(xdata, ydata, **kwargs)  # Calls set_data() below
+
+    def set_data(self, *args):
+        x, y = args[0] if len(args) == 1 else args
+        self._full = (np.asarray(x), np.asarray(y))
+        self._ascending = len(self._full[0]) > 1 and bool(np.all(np.diff(self._full[0]) > 0))
+        self._ranks = None
+        self._view_key = None
+        super().set_data(*self._full)
+
+    def get_full_data(self):
+        return self._full
+
+    def draw(self, renderer):
+        ax = self.axes
+        if ax is not None and len(self._full[0]) >= MIN_POINTS:
+            key = (tuple(ax.viewLim.bounds), tuple(ax.bbox.bounds), self.tolerance)
+            if key != self._view_key:
+                self._view_key = key
+                if self._ranks is None and not self._ascending:
+                    self._ranks = path_ranks(*self._full)  # Once per data set; views only threshold them
+                Line2D.set_data(self, *decimate_path(ax, *self._full, self.tolerance, self._ascending, self._ranks))
+        super().draw(renderer)
+
+# ax.plot() for one dense line: a DecimatedLine added to the axes (style as keyword
+# arguments, e.g. color="r", linestyle="-")
+def plot_decimated(ax, x, y, tolerance=DEFAULT_TOLERANCE, **kwargs):
+    line = DecimatedLine(x, y, tolerance, **kwargs)
+    ax.add_line(line)
+    return line
+
+# Draw a Track (tracks.py): its sky path (x east, y north) or one field against time
+def plot_track(ax, track, field=None, tolerance=DEFAULT_TOLERANCE, **kwargs):
+    if field is None:
+        return plot_decimated(ax, *track.xy(), tolerance, **kwargs)
+    return plot_decimated(ax, track["time"], track[field], tolerance, **kwargs)
+
+# Simplify 3D paths (e.g. Line3DCollection segments) in data space; a tolerance in pixels
+# is converted with the axes' x span and width, which a 3D rotation leaves roughly unchanged
+def simplify_segments3d(ax, segments, tolerance=DEFAULT_TOLERANCE):
+    if tolerance <= 0:
+        return list(segments)
+    x0, x1 = ax.get_xlim3d()
+    data_tolerance = tolerance * (x1 - x0) / max(ax.bbox.width, 1)
+    return [segment if len(segment) < 3 else segment[simplify_indices(segment, data_tolerance)] for segment in segments]
@@ -0,0 +1,207 @@
+import csv
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+
+from instrumentation import span
+
+# Shared geocoding layer used by every script.
+# Lookups go: in-process memory -> bundled gazetteer -> on-disk cache -> Nominatim.
+# The network is only touched on a true miss, and only when online lookups are enabled.
+
+USER_AGENT = "sun_moon_simulator"
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer.csv")
+CACHE_DIR = os.environ.get("SOLARSYSTEM_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "solarsystem"))
+DEFAULT_CACHE_PATH = os.path.join(CACHE_DIR, "geocode.sqlite3")
+
+# Normalize a place name so "  São Paulo ", "sao paulo" and "SAO-PAULO" share one key
+def normalize_name(name):
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(ch for ch in name if not unicodedata.combining(ch))
+    name = re.sub(r"[^\w]+", " ", name.casefold())
+    return " ".join(name.split())
+
+# Parse "latitude,longitude" text; returns None when the text is not a coordinate pair, and
+# raises ValueError for a pair out of range (a mistyped coordinate is not a place name)
+def parse_coordinates(text):
+    parts = text.split(",")
+    if len(parts) != 2:
+        return None
+    try:
+        lat, lon = float(parts[0]), float(parts[1])
+    except ValueError:
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(f"Coordinates out of range: {text.strip()!r} (latitude -90 to 90, longitude -180 to 180)")
+    return lat, lon
+
+# Load the bundled gazetteer into a dict indexed by normalized name
+def load_gazetteer(path=GAZETTEER_PATH):
+    places = {}
+    if not path or not os.path.exists(path):
+        return places
+    with open(path, newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            places[normalize_name(row["name"])] = (float(row["latitude"]), float(row["longitude"]), row.get("timezone") or None)
+    return places
+
+# Persistent cache of geocoding answers (including "not found" answers)
+class GeocodeCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS geocode ("
+            "query TEXT PRIMARY KEY, latitude REAL, longitude REAL, source TEXT, created REAL)"
+        )
+        self.connection.commit()
+
+    def get(self, key):
+        row = self.connection.execute("SELECT latitude, longitude FROM geocode WHERE query = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1]
+
+    def put(self, key, latitude, longitude, source):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?)",
+            (key, latitude, longitude, source, time.time()),
+        )
+        self.connection.commit()
+
+    # Store many (key, latitude, longitude, source) answers in one transaction
+    def put_many(self, rows):
+        now = time.time()
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?)",
+            [(key, latitude, longitude, source, now) for key, latitude, longitude, source in rows],
+        )
+        self.connection.commit()
+
+    def keys(self):
+        return {row[0] for row in self.connection.execute("SELECT query FROM geocode")}
+
+    def close(self):
+        self.connection.close()
+
+# Geocoder with offline gazetteer, persistent cache and optional Nominatim fallback.
+# nominatim_url points the fallback at another server, e.g. a local stand-in for tests.
+class Geocoder:
+    def __init__(self, cache_path=DEFAULT_CACHE_PATH, gazetteer_path=GAZETTEER_PATH, online=True,
+                 nominatim_url=None, timeout=10):
+        self.gazetteer = load_gazetteer(gazetteer_path)
+        self.cache = GeocodeCache(cache_path) if cache_path else None
+        self.online = online
+        self.nominatim_url = nominatim_url
+        self.timeout = timeout
+        self.memory = {}
+        self.stats = {"memory": 0, "gazetteer": 0, "cache": 0, "network": 0, "not_found": 0}
+        self._client = None
+
+    # Lazily build a single Nominatim client; geopy is only imported when really needed
+    def client(self):
+        if self._client is None:
+            from geopy.geocoders import Nominatim
+
+            options = {"user_agent": USER_AGENT, "timeout": self.timeout}
+            if self.nominatim_url:
+                scheme, _, domain = self.nominatim_url.partition("://")
+                options.update(scheme=scheme, domain=domain.rstrip("/"))
+            self._client = Nominatim(**options)
+        return self._client
+
+    # Ask Nominatim; returns (lat, lon) or (None, None)
+    def query_network(self, name):
+        with span("geocode.network"):
+            location_data = self.client().geocode(name)
+        if location_data:
+            return location_data.latitude, location_data.longitude
+        return None, None
+
+    # Offline part of a lookup; returns (lat, lon), (None, None) for a cached miss, or None
+    def lookup_offline(self, key):
+        if key in self.memory:
+            self.stats["memory"] += 1
+            return self.memory[key]
+        if key in self.gazetteer:
+            self.stats["gazetteer"] += 1
+            result = self.gazetteer[key][:2]
+        elif self.cache is not None and (cached := self.cache.get(key)) is not None:
+            self.stats["cache"] += 1
+            result = cached
+        else:
+            return None
+        self.memory[key] = result
+        return result
+
+    # Remember an answer in memory and on disk; misses from a non-default server stay in memory
+    def remember(self, key, latitude, longitude, source="nominatim"):
+        self.memory[key] = (latitude, longitude)
+        if self.cache is not None and (latitude is not None or not self.nominatim_url):
+            self.cache.put(key, latitude, longitude, source)
+
+    def lookup(self, name):
+        key = normalize_name(name)
+        result = self.lookup_offline(key)
+        if result is None:
+            if not self.online:
+                raise ValueError("Location not found in the offline gazetteer or cache.")
+            self.stats["network"] += 1
+            result = self.query_network(name)
+            self.remember(key, *result)
+        if result[0] is None:
+            self.stats["not_found"] += 1
+            raise ValueError("Location not found.")
+        return result
+
+    def lookup_many(self, names):
+        results = []
+        for name in names:
+            try:
+                results.append(self.lookup(name))
+            except ValueError:
+                results.append((None, None))
+        return results
+
+    # Time zone name for a gazetteer place, if known
+    def timezone(self, name):
+        place = self.gazetteer.get(normalize_name(name))
+        return place[2] if place else None
+
+_default_geocoder = None
+
+# Process-wide geocoder configured from the environment:
+#   SOLARSYSTEM_GEOCODER=offline   never touch the network
+#   SOLARSYSTEM_NOMINATIM_URL=...  use another Nominatim-compatible server
+def get_geocoder():
+    global _default_geocoder
+    if _default_geocoder is None:
+        _default_geocoder = Geocoder(
+            online=os.environ.get("SOLARSYSTEM_GEOCODER", "online") != "offline",
+            nominatim_url=os.environ.get("SOLARSYSTEM_NOMINATIM_URL"),
+        )
+    return _default_geocoder
+
+# Function to get latitude and longitude based on a place name
+def get_coordinates(location):
+    try:
+        return get_geocoder().lookup(location)
+    except Exception as e:
+        print(f"Error: {e}")
+        return None, None
+
+# Resolve user input that is either "latitude,longitude" or a place name
+def resolve_location(location_input):
+    try:
+        coordinates = parse_coordinates(location_input)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return None, None
+    if coordinates is not None:
+        return coordinates
+    with span("geocode"):
+        return get_coordinates(location_input)
@@ -0,0 +1,54 @@
+import functools
+
+import numpy as np
+
+# Cached sphere geometry for the 3D scenes.
+# One unit-sphere mesh is built per resolution and reused for every body through a
+# scale + translate, and the resolution follows the sphere's size on screen: a Sun
+# that covers a few pixels does not need the same mesh as an Earth that fills the plot.
+
+MIN_SEGMENTS = 6
+MAX_SEGMENTS = 40
+PIXELS_PER_SEGMENT = 10  # Target on-screen length of one mesh edge along the equator
+
+# Unit-sphere mesh with `segments` faces around and segments / 2 + 1 rings, built once.
+# The arrays are read-only because they are shared between all callers.
+@functools.lru_cache(maxsize=32)
+def unit_sphere(segments):
+    u = np.linspace(0, 2 * np.pi, segments + 1)
+    v = np.linspace(0, np.pi, segments // 2 + 1)
+    mesh = (
+        np.outer(np.cos(u), np.sin(v)),
+        np.outer(np.sin(u), np.sin(v)),
+        np.outer(np.ones(np.size(u)), np.cos(v)),
+    )
+    for array in mesh:
+        array.flags.writeable = False
+    return mesh
+
+# Scaled and translated copy of the cached unit sphere
+def sphere_mesh(center, radius, segments):
+    x, y, z = unit_sphere(segments)
+    return radius * x + center[0], radius * y + center[1], radius * z + center[2]
+
+# Mesh resolution for a sphere that spans `radius` data units when `extent` data units
+# fill `pixels` screen pixels
+def segments_for_size(radius, extent, pixels):
+    circumference_pixels = 2 * np.pi * radius / extent * pixels
+    segments = int(round(circumference_pixels / PIXELS_PER_SEGMENT))
+    return int(np.clip(segments + segments % 2, MIN_SEGMENTS, MAX_SEGMENTS))
+
+# Mesh resolution for a sphere drawn on these axes; extent defaults to the widest axis range
+def segments_for(ax, radius, extent=None):
+    if extent is None:
+        limits = (ax.get_xlim(), ax.get_ylim()) + ((ax.get_zlim(),) if hasattr(ax, "get_zlim") else ())
+        extent = max(high - low for low, high in limits)
+    bbox = ax.get_window_extent()
+    return segments_for_size(radius, extent, min(bbox.width, bbox.height))
+
+# Draw a sphere with a cached mesh at a resolution matched to its on-screen size
+def plot_sphere(ax, center, radius, segments=None, extent=None, **kwargs):
+    if segments is None:
+        segments = segments_for(ax, radius, extent)
+    x, y, z = sphere_mesh(center, radius, segments)
+    return ax.plot_surface(x, y, z, rstride=1, cstride=1, **kwargs)
@@ -0,0 +1,212 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+# Named timing spans for the expensive stages (geocoding, position computation,
+# plotting, savefig and show), kept in a process-wide registry.
+#
+#   with span("savefig"):
+#       fig.savefig(path)
+#
+# Every finished span adds to its stage's count, total and maximum seconds. The
+# registry can be read as a dict (stage_metrics), as Prometheus text format
+# (prometheus_text, served by position_service.py at /metrics) or as one JSON line
+# per finished span. Configured from the environment when first imported, or with
+# configure() / the global flags of solarsystem.py:
+#
+#   SOLARSYSTEM_METRICS=1        print a per-stage summary to stderr at exit
+#   SOLARSYSTEM_METRICS=PATH     also append a JSON line per span to PATH ("-" = stderr)
+#   SOLARSYSTEM_PROFILE=PATH     run cProfile for the whole process, dump stats to PATH
+#   SOLARSYSTEM_TRACEMALLOC=1    trace Python allocations; spans record their peak bytes
+#                                and the top allocation sites are printed at exit
+#
+# Per-span peak memory relies on tracemalloc's single process-wide peak, so it is only
+# exact when spans do not overlap across threads.
+
+PROMETHEUS_PREFIX = "solarsystem"
+TOP_PROFILE_ENTRIES = 20
+TOP_ALLOCATIONS = 10
+
+_lock = threading.Lock()
+_stages = {}  # name -> {"count", "seconds", "max_seconds", "last_seconds", "peak_bytes"}
+_local = threading.local()
+_settings = {"log": None, "summary": False, "profiler": None, "profile_path": None, "tracemalloc": False}
+
+class span:
+    __slots__ = ("name", "labels", "started", "frame")
+
+    def __init__(self, name, **labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        if _settings["tracemalloc"]:
+            self.frame = _memory_enter()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.started
+        peak_bytes = _memory_exit(self.frame) if _settings["tracemalloc"] else None
+        record(self.name, seconds, peak_bytes, **self.labels)
+        return False
+
+    # Use a span as a decorator: the whole call is timed under `name`
+    def __call__(self, function):
+        name, labels = self.name, self.labels
+
+        def timed(*args, **kwargs):
+            with span(name, **labels):
+                return function(*args, **kwargs)
+
+        timed.__name__ = function.__name__
+        timed.__doc__ = function.__doc__
+        timed.__wrapped__ = function
+        return timed
+
+# Add one finished span to the registry (and the JSON-lines log, if enabled)
+def record(name, seconds, peak_bytes=None, **labels):
+    with _lock:
+        stage = _stages.get(name)
+        if stage is None:
+            stage = _stages[name] = {"count": 0, "seconds": 0.0, "max_seconds": 0.0, "last_seconds": 0.0, "peak_bytes": None}
+        stage["count"] += 1
+        stage["seconds"] += seconds
+        stage["last_seconds"] = seconds
+        if seconds > stage["max_seconds"]:
+            stage["max_seconds"] = seconds
+        if peak_bytes is not None and (stage["peak_bytes"] is None or peak_bytes > stage["peak_bytes"]):
+            stage["peak_bytes"] = peak_bytes
+        log = _settings["log"]
+        if log is not None:
+            entry = {"time": time.time(), "pid": os.getpid(), "span": name, "seconds": seconds}
+            if peak_bytes is not None:
+                entry["peak_bytes"] = peak_bytes
+            entry.update(labels)
+            log.write(json.dumps(entry, default=str) + "\n")
+            log.flush()
+
+# tracemalloc keeps one peak per process; reset it for each span and carry the
+# enclosing span's peak so far on a per-thread stack
+def _memory_enter():
+    import tracemalloc
+
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    current, peak = tracemalloc.get_traced_memory()
+    if stack:
+        stack[-1][1] = max(stack[-1][1], peak)
+    tracemalloc.reset_peak()
+    frame = [current, current]
+    stack.append(frame)
+    return frame
+
+def _memory_exit(frame):
+    import tracemalloc
+
+    stack = _local.stack
+    peak = max(frame[1], tracemalloc.get_traced_memory()[1])
+    if stack and stack[-1] is frame:
+        stack.pop()
+    if stack:
+        stack[-1][1] = max(stack[-1][1], peak)
+    return peak - frame[0]
+
+# Copy of the per-stage metrics: {name: {"count", "seconds", "max_seconds", ...}}
+def stage_metrics():
+    with _lock:
+        return {name: dict(stage) for name, stage in _stages.items()}
+
+def reset():
+    with _lock:
+        _stages.clear()
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# One Prometheus metric family: `samples` is a list of ({label: value}, number)
+def prometheus_family(name, kind, help_text, samples):
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        label_text = ",".join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+        lines.append(f"{name}{{{label_text}}} {value!r}" if label_text else f"{name} {value!r}")
+    return "\n".join(lines) + "\n"
+
+# Stage metrics in the Prometheus text exposition format
+def prometheus_text(prefix=PROMETHEUS_PREFIX):
+    stages = sorted(stage_metrics().items())
+    # A summary without quantiles: only the _sum and _count series
+    text = f"# HELP {prefix}_stage_seconds Time spent in each named stage\n# TYPE {prefix}_stage_seconds summary\n"
+    for name, stage in stages:
+        text += (f'{prefix}_stage_seconds_sum{{stage="{_escape(name)}"}} {stage["seconds"]!r}\n'
+                 f'{prefix}_stage_seconds_count{{stage="{_escape(name)}"}} {stage["count"]}\n')
+    text += prometheus_family(f"{prefix}_stage_max_seconds", "gauge", "Longest single span of each stage",
+                              [({"stage": name}, stage["max_seconds"]) for name, stage in stages])
+    peaks = [({"stage": name}, stage["peak_bytes"]) for name, stage in stages if stage["peak_bytes"] is not None]
+    if peaks:
+        text += prometheus_family(f"{prefix}_stage_peak_bytes", "gauge", "Largest traced allocation peak within a span", peaks)
+    return text
+
+# Human-readable per-stage table, slowest total first
+def summary_text():
+    stages = sorted(stage_metrics().items(), key=lambda item: -item[1]["seconds"])
+    lines = [f"{'stage':24} {'count':>7} {'total s':>10} {'mean ms':>10} {'max ms':>10} {'peak MB':>9}"]
+    for name, stage in stages:
+        peak = f"{stage['peak_bytes'] / 1e6:9.1f}" if stage["peak_bytes"] is not None else f"{'':9}"
+        lines.append(f"{name:24} {stage['count']:7d} {stage['seconds']:10.3f} "
+                     f"{stage['seconds'] / stage['count'] * 1000:10.2f} {stage['max_seconds'] * 1000:10.2f} {peak}")
+    return "\n".join(lines)
+
+# Turn on structured logs, the exit summary, cProfile or tracemalloc.
+# `metrics`: None (unchanged), "1"/True (summary only), or a JSON-lines path ("-" = stderr).
+def configure(metrics=None, profile=None, trace_memory=False):
+    if metrics not in (None, False, "", "0"):
+        _settings["summary"] = True
+        if metrics not in (True, "1"):
+            if _settings["log"] not in (None, sys.stderr):
+                _settings["log"].close()
+            _settings["log"] = sys.stderr if metrics == "-" else open(metrics, "a", encoding="utf-8")
+    if trace_memory and not _settings["tracemalloc"]:
+        import tracemalloc
+
+        tracemalloc.start()
+        _settings["tracemalloc"] = True
+    if profile and _settings["profiler"] is None:
+        import cProfile
+
+        _settings["profile_path"] = profile
+        _settings["profiler"] = cProfile.Profile()
+        _settings["profiler"].enable()
+
+def configure_from_environment(environ=os.environ):
+    configure(metrics=environ.get("SOLARSYSTEM_METRICS"), profile=environ.get("SOLARSYSTEM_PROFILE"),
+              trace_memory=environ.get("SOLARSYSTEM_TRACEMALLOC", "0") not in ("", "0"))
+
+# Exit report: profile dump and hot spots, top allocation sites, stage summary
+def _report_at_exit():
+    profiler = _settings["profiler"]
+    if profiler is not None:
+        import pstats
+
+        profiler.disable()
+        profiler.dump_stats(_settings["profile_path"])
+        sys.stderr.write(f"cProfile stats written to {_settings['profile_path']}\n")
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(TOP_PROFILE_ENTRIES)
+    if _settings["tracemalloc"]:
+        import tracemalloc
+
+        current, peak = tracemalloc.get_traced_memory()
+        sys.stderr.write(f"tracemalloc: {current / 1e6:.1f} MB traced at exit, top allocation sites:\n")
+        for statistic in tracemalloc.take_snapshot().statistics("lineno")[:TOP_ALLOCATIONS]:
+            sys.stderr.write(f"  {statistic}\n")
+    if _settings["summary"] and _stages:
+        sys.stderr.write(summary_text() + "\n")
+    if _settings["log"] not in (None, sys.stderr):
+        _settings["log"].close()
+
+configure_from_environment()
+atexit.register(_report_at_exit)
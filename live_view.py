@@ -0,0 +1,163 @@
+import argparse
+import collections
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+import rendering
+import matplotlib.pyplot as plt
+from matplotlib.animation import FuncAnimation
+
+from charts import draw_compass
+from ephemeris import daily_sun_xy, daily_moon_xy, daily_sun_angles, daily_moon_angles
+from timescale import local_hours
+
+# Live sky view: keeps one figure open and moves the Sun and Moon markers in place.
+# Only the markers and the clock text are animated and redrawn through blitting, so a
+# frame costs a background restore plus three small artists instead of a full redraw.
+
+MODELS = ("sunposition", "positions", "angles")
+
+# Rolling frame-time statistics; a frame that arrives more than 1.5 intervals after
+# the previous one counts the missed intervals as dropped frames
+class FrameStats:
+    def __init__(self, fps, window=300):
+        self.interval = 1 / fps
+        self.frame_times = collections.deque(maxlen=window)
+        self.update_times = collections.deque(maxlen=window)
+        self.frames = 0
+        self.dropped = 0
+        self.last = None
+
+    def record(self, update_seconds):
+        now = time.perf_counter()
+        if self.last is not None:
+            elapsed = now - self.last
+            self.frame_times.append(elapsed)
+            if elapsed > 1.5 * self.interval:
+                self.dropped += int(round(elapsed / self.interval)) - 1
+        self.last = now
+        self.update_times.append(update_seconds)
+        self.frames += 1
+
+    def summary(self):
+        frame_times = np.array(self.frame_times) if self.frame_times else np.array([np.nan])
+        return {
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "fps": float(1 / np.mean(frame_times)),
+            "frame_ms_mean": float(np.mean(frame_times) * 1000),
+            "frame_ms_p95": float(np.percentile(frame_times, 95) * 1000),
+            "update_ms_mean": float(np.mean(self.update_times) * 1000) if self.update_times else float("nan"),
+        }
+
+class LiveSkyView:
+    def __init__(self, model="angles", latitude=90.0, longitude=0.0, label="", fps=30, speed=1.0, figsize=(8, 8)):
+        self.model = model
+        self.latitude = latitude
+        self.longitude = longitude
+        self.fps = fps
+        self.speed = speed
+        self.started = datetime.now(timezone.utc)
+        self.started_clock = time.perf_counter()
+        self.stats = FrameStats(fps)
+
+        self.fig, self.ax = plt.subplots(figsize=figsize)
+        ax = self.ax
+        ax.set_xlim(-1.5, 1.5)  # x-axis range (East-West)
+        ax.set_ylim(-1.5, 1.5)  # y-axis range (North-South)
+        ax.set_aspect('equal', 'box')
+        ax.set_xlabel("East-West (x-axis)")
+        ax.set_ylabel("North-South (y-axis)")
+        ax.set_title(f"Sun and Moon Positions (Live{': ' + label if label else ''})")
+        draw_compass(ax)
+        ax.plot([0, 1], [0, -1], 'k--', label="Southeast (SE)")
+
+        # The only artists that change between frames
+        self.sun_marker, = ax.plot([], [], 'ro', label="Sun", animated=True)
+        self.moon_marker, = ax.plot([], [], 'bo', label="Moon", animated=True)
+        self.clock = ax.text(-1.45, 1.4, "", fontsize=10, va='top', animated=True)
+        ax.legend(loc="lower left")
+        self.artists = (self.sun_marker, self.moon_marker, self.clock)
+
+    # Simulated current time: real time, optionally sped up
+    def current_time(self):
+        return self.started + timedelta(seconds=(time.perf_counter() - self.started_clock) * self.speed)
+
+    # Hour of day the scripts feed into their models
+    def model_hour(self, now):
+        if self.model == "sunposition":
+            return float(local_hours(now.timestamp()))  # SunPosition.py uses the machine's time zone
+        # 2Dpositions.py / SunandMoon.py: the site's time zone
+        return float(local_hours(now.timestamp(), self.latitude, self.longitude))
+
+    # Marker positions for the chosen model
+    def positions(self, hour):
+        if self.model == "angles":
+            sun_azimuth, _ = daily_sun_angles(hour, self.latitude)
+            moon_azimuth, _ = daily_moon_angles(hour)
+            sun = np.cos(np.radians(sun_azimuth)), np.sin(np.radians(sun_azimuth))
+            moon = np.cos(np.radians(moon_azimuth)), np.sin(np.radians(moon_azimuth))
+            return sun, moon
+        latitude = 90.0 if self.model == "sunposition" else self.latitude
+        return daily_sun_xy(hour, latitude), daily_moon_xy(hour)
+
+    def update(self, frame=None):
+        started = time.perf_counter()
+        hour = self.model_hour(self.current_time())
+        (sun_x, sun_y), (moon_x, moon_y) = self.positions(hour)
+        self.sun_marker.set_data([sun_x], [sun_y])
+        self.moon_marker.set_data([moon_x], [moon_y])
+        summary = self.stats.summary() if self.stats.frames else None
+        status = f"{hour:05.2f}h"
+        if summary:
+            status += f"  {summary['fps']:.0f} fps  dropped {summary['dropped']}"
+        self.clock.set_text(status)
+        self.stats.record(time.perf_counter() - started)
+        return self.artists
+
+    # Open the window and animate until it is closed
+    def run(self):
+        self.animation = FuncAnimation(self.fig, self.update, interval=1000 / self.fps, blit=True, cache_frame_data=False)
+        rendering.show(self.fig)
+        return self.stats.summary()
+
+    # Render frames with manual blitting and no GUI; measures the sustainable frame rate
+    def benchmark(self, frames=300):
+        canvas = self.fig.canvas
+        canvas.draw()
+        background = canvas.copy_from_bbox(self.ax.bbox)
+        self.stats = FrameStats(self.fps)
+        for _ in range(frames):
+            canvas.restore_region(background)
+            for artist in self.update():
+                self.ax.draw_artist(artist)
+            canvas.blit(self.ax.bbox)
+        return self.stats.summary()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Live Sun and Moon sky view with blitted marker updates.")
+    parser.add_argument("--model", choices=MODELS, default="angles",
+                        help="sunposition = SunPosition.py, positions = 2Dpositions.py, angles = SunandMoon.py")
+    parser.add_argument("--location", default=None, help="Place name or 'latitude,longitude'")
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--speed", type=float, default=1.0, help="Simulated seconds per real second")
+    parser.add_argument("--benchmark", type=int, metavar="FRAMES", help="Render FRAMES frames headless and report frame times")
+    args = parser.parse_args(argv)
+
+    latitude, longitude = 90.0, 0.0
+    if args.location:
+        from geocoding import resolve_location
+
+        latitude, longitude = resolve_location(args.location)
+        if latitude is None:
+            print("Could not find the location. Please enter a valid location.")
+            raise SystemExit(1)
+
+    view = LiveSkyView(args.model, latitude, longitude, args.location or "", args.fps, args.speed)
+    summary = view.benchmark(args.benchmark) if args.benchmark else view.run()
+    print(", ".join(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}" for key, value in summary.items()))
+
+if __name__ == "__main__":
+    main()
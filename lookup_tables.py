@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+import ephemeris
+from ephemeris import calculate_position, sun_altaz, moon_altaz, to_epoch_seconds
+from geocoding import CACHE_DIR
+
+# Precomputed Sun/Moon azimuth-altitude tables for fixed sites.
+# A table is a float32 .npy file (memory-mapped when read) with one row per time step,
+# plus a small JSON sidecar describing the grid. Each row holds the Sun's and Moon's
+# unit direction vectors (east, north, up). Queries interpolate linearly between the
+# two neighbouring rows and convert back with arctan2, so answering "where is the Moon
+# now" never evaluates the ephemeris series. Interpolating vectors rather than angles
+# keeps the error small when a body passes close to the zenith.
+
+TABLE_DIR = os.path.join(CACHE_DIR, "tables")
+TABLE_COLUMNS = ("sun_x", "sun_y", "sun_z", "moon_x", "moon_y", "moon_z")
+RESULT_NAMES = ("sun_azimuth", "sun_altitude", "moon_azimuth", "moon_altitude")
+
+# Paths of the data and metadata files for a named table
+def table_paths(name, directory=TABLE_DIR):
+    base = os.path.join(directory, name)
+    return base + ".npy", base + ".json"
+
+# Compute a site's table and write it to disk chunk by chunk
+def build_table(name, latitude, longitude, start, stop, step_seconds=60, directory=TABLE_DIR, chunk_rows=1 << 18):
+    start = float(to_epoch_seconds(start))
+    stop = float(to_epoch_seconds(stop))
+    count = int(np.ceil((stop - start) / step_seconds)) + 1
+    data_path, meta_path = table_paths(name, directory)
+    os.makedirs(directory, exist_ok=True)
+
+    data = np.lib.format.open_memmap(data_path, mode="w+", dtype=np.float32, shape=(count, len(TABLE_COLUMNS)))
+    for first in range(0, count, chunk_rows):
+        rows = slice(first, min(first + chunk_rows, count))
+        times = start + np.arange(rows.start, rows.stop) * step_seconds
+        data[rows, 0:3] = np.stack(calculate_position(*sun_altaz(times, latitude, longitude), 1.0), axis=-1)
+        data[rows, 3:6] = np.stack(calculate_position(*moon_altaz(times, latitude, longitude), 1.0), axis=-1)
+    data.flush()
+    del data
+
+    meta = {
+        "name": name,
+        "latitude": latitude,
+        "longitude": longitude,
+        "start": start,
+        "step": step_seconds,
+        "count": count,
+        "columns": list(TABLE_COLUMNS),
+        "model_version": ephemeris.MODEL_VERSION,
+    }
+    with open(meta_path, "w") as handle:
+        json.dump(meta, handle, indent=2)
+    return SiteTable(name, directory)
+
+# A memory-mapped site table with interpolated lookups
+class SiteTable:
+    def __init__(self, name, directory=TABLE_DIR):
+        data_path, meta_path = table_paths(name, directory)
+        with open(meta_path) as handle:
+            self.meta = json.load(handle)
+        self.data = np.load(data_path, mmap_mode="r")
+        self.latitude = self.meta["latitude"]
+        self.longitude = self.meta["longitude"]
+        self.start = self.meta["start"]
+        self.step = self.meta["step"]
+        self.stop = self.start + (self.meta["count"] - 1) * self.step
+
+    # True when the table was built by the current ephemeris model
+    def is_current(self):
+        return self.meta.get("model_version") == ephemeris.MODEL_VERSION
+
+    def covers(self, epoch_seconds):
+        t = np.asarray(epoch_seconds, dtype=np.float64)
+        return (t >= self.start) & (t <= self.stop)
+
+    # Interpolated (sun_az, sun_alt, moon_az, moon_alt) for scalar or array timestamps
+    def lookup(self, epoch_seconds):
+        t = np.asarray(epoch_seconds, dtype=np.float64)
+        if not np.all(self.covers(t)):
+            raise ValueError("Timestamp outside the precomputed table range.")
+        position = (t - self.start) / self.step
+        index = np.minimum(position.astype(np.int64), len(self.data) - 2)
+        fraction = (position - index)[..., np.newaxis]
+
+        before = self.data[index].astype(np.float64)
+        vectors = before + fraction * (self.data[index + 1] - before)
+
+        result = []
+        for first in (0, 3):
+            x, y, z = vectors[..., first], vectors[..., first + 1], vectors[..., first + 2]
+            result.append(np.degrees(np.arctan2(x, y)) % 360)
+            result.append(np.degrees(np.arctan2(z, np.hypot(x, y))))
+        return tuple(result)
+
+# Angular distance on the sky (degrees) between two azimuth/altitude positions
+def angular_separation(azimuth1, altitude1, azimuth2, altitude2):
+    a1, a2 = np.radians(altitude1), np.radians(altitude2)
+    cosine = np.sin(a1) * np.sin(a2) + np.cos(a1) * np.cos(a2) * np.cos(np.radians(azimuth1 - azimuth2))
+    return np.degrees(np.arccos(np.clip(cosine, -1, 1)))
+
+# Compare table lookups with the direct computation at random instants.
+# Returns the maximum altitude error and the maximum on-sky separation (degrees)
+# for each body. Raw azimuth differences are not used because azimuth is
+# ill-conditioned near the zenith, where a tiny position error swings it wildly.
+def check_accuracy(table, samples=100000, seed=0):
+    times = np.random.default_rng(seed).uniform(table.start, table.stop, samples)
+    looked_up = table.lookup(times)
+    direct = sun_altaz(times, table.latitude, table.longitude) + moon_altaz(times, table.latitude, table.longitude)
+    errors = {}
+    for body, column in (("sun", 0), ("moon", 2)):
+        azimuth, altitude = looked_up[column], looked_up[column + 1]
+        exact_azimuth, exact_altitude = direct[column], direct[column + 1]
+        errors[f"{body}_altitude"] = float(np.max(np.abs(altitude - exact_altitude)))
+        errors[f"{body}_separation"] = float(np.max(angular_separation(azimuth, altitude, exact_azimuth, exact_altitude)))
+    return errors
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build, check and query precomputed Sun/Moon tables for fixed sites.")
+    parser.add_argument("--directory", default=TABLE_DIR, help="Where tables are stored")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Precompute a site table")
+    build.add_argument("name")
+    build.add_argument("--lat", type=float, required=True)
+    build.add_argument("--lon", type=float, required=True)
+    build.add_argument("--start", required=True, help="ISO date, e.g. 2024-01-01")
+    build.add_argument("--stop", required=True, help="ISO date, e.g. 2025-01-01")
+    build.add_argument("--step", type=float, default=60, help="Seconds between rows")
+
+    check = commands.add_parser("check", help="Measure interpolation error against the direct computation")
+    check.add_argument("name")
+    check.add_argument("--samples", type=int, default=100000)
+    check.add_argument("--tolerance", type=float, default=0.05, help="Maximum acceptable error in degrees")
+
+    query = commands.add_parser("query", help="Look up positions for a site")
+    query.add_argument("name")
+    query.add_argument("--time", help="ISO timestamp in UTC (default: now)")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        started = time.perf_counter()
+        table = build_table(args.name, args.lat, args.lon, np.datetime64(args.start), np.datetime64(args.stop), args.step, args.directory)
+        print(f"Built {table.meta['count']} rows in {time.perf_counter() - started:.2f}s")
+    elif args.command == "check":
+        table = SiteTable(args.name, args.directory)
+        if not table.is_current():
+            print("Warning: table was built by an older ephemeris model; rebuild it.")
+        errors = check_accuracy(table, args.samples)
+        for name, error in errors.items():
+            print(f"{name}: max error {error:.5f}°")
+        if max(errors.values()) > args.tolerance:
+            print(f"Error exceeds the {args.tolerance}° tolerance.")
+            raise SystemExit(1)
+    else:
+        table = SiteTable(args.name, args.directory)
+        now = to_epoch_seconds(np.datetime64(args.time)) if args.time else time.time()
+        for name, value in zip(RESULT_NAMES, table.lookup(now)):
+            print(f"{name}: {float(value):.3f}°")
+
+if __name__ == "__main__":
+    main()
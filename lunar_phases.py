@@ -0,0 +1,119 @@
+import argparse
+import functools
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from ephemeris import SECONDS_PER_DAY, moon_phase_angle, to_epoch_seconds
+
+# Lunar phase event finder.
+# The phase angle (Moon minus Sun ecliptic longitude) is sampled once per coarse step
+# over the whole range in one vectorized call; every step where it crosses a target
+# angle brackets one event, and all brackets are then refined together with a few
+# Newton iterations. Results are cached per calendar year, so the chart scripts can
+# look events up repeatedly without recomputing them. The phase angle comes from the
+# precise ephemeris tier, so events are good to the minute.
+
+PHASES = {"new": 0.0, "first_quarter": 90.0, "full": 180.0, "last_quarter": 270.0}
+COARSE_STEP_DAYS = 1.0  # The phase angle advances about 12 degrees a day, so each step holds at most one event
+TOLERANCE_SECONDS = 10.0  # Newton steps stop below this, comparable to the model error and well inside the minute
+MAX_ITERATIONS = 8
+
+# Phase angle minus the target, wrapped into [-180, 180)
+def _offset(epoch_seconds, target):
+    return np.mod(moon_phase_angle(epoch_seconds, "precise") - target + 180, 360) - 180
+
+# Epoch seconds of a date string ("2024-09-01"), datetime, datetime64 or number
+def _seconds(value):
+    if isinstance(value, str):
+        value = np.datetime64(value)
+    return float(to_epoch_seconds(value))
+
+# Times (epoch seconds, UTC) of every `phase` event in [start, stop)
+def find_phases(start, stop, phase="full", step_days=COARSE_STEP_DAYS):
+    if phase not in PHASES:
+        raise ValueError(f"Unknown phase {phase!r}; expected one of {', '.join(PHASES)}")
+    target = PHASES[phase]
+    start = _seconds(start)
+    stop = _seconds(stop)
+    step = step_days * SECONDS_PER_DAY
+
+    # Coarse pass: brackets where the offset goes from negative to non-negative
+    samples = np.append(np.arange(start, stop, step), stop)
+    offset = _offset(samples, target)
+    brackets = np.flatnonzero((offset[:-1] < 0) & (offset[1:] >= 0))
+    low, high = samples[brackets], samples[brackets + 1]
+
+    # Refine every bracket at once: Newton steps with a one-minute numerical derivative,
+    # clamped to the bracket
+    times = low - offset[brackets] * (high - low) / (offset[brackets + 1] - offset[brackets])
+    for _ in range(MAX_ITERATIONS):
+        value = _offset(times, target)
+        rate = (_offset(times + 60, target) - value) / 60
+        correction = value / rate
+        times = np.clip(times - correction, low, high)
+        if np.all(np.abs(correction) < TOLERANCE_SECONDS):
+            break
+    return times[(times >= start) & (times < stop)]
+
+# All four phases in [start, stop), in time order: (times, phase names)
+def find_all_phases(start, stop):
+    times = []
+    names = []
+    for phase in PHASES:
+        found = find_phases(start, stop, phase)
+        times.append(found)
+        names.append(np.full(len(found), phase, dtype=object))
+    times = np.concatenate(times)
+    order = np.argsort(times, kind="stable")
+    return times[order], np.concatenate(names)[order]
+
+def _year_bounds(year):
+    return (datetime(year, 1, 1, tzinfo=timezone.utc).timestamp(),
+            datetime(year + 1, 1, 1, tzinfo=timezone.utc).timestamp())
+
+# Cached events of one phase during a calendar year (UTC); the array is shared, so read-only
+@functools.lru_cache(maxsize=256)
+def phases_in_year(year, phase="full"):
+    times = find_phases(*_year_bounds(year), phase)
+    times.flags.writeable = False
+    return times
+
+# Full moons of a calendar year (epoch seconds, UTC)
+def full_moons(year):
+    return phases_in_year(year, "full")
+
+# The `phase` event nearest to a given time
+def nearest_phase(when, phase="full"):
+    t = _seconds(when)
+    year = datetime.fromtimestamp(t, timezone.utc).year
+    candidates = np.concatenate([phases_in_year(year - 1, phase), phases_in_year(year, phase), phases_in_year(year + 1, phase)])
+    return float(candidates[np.argmin(np.abs(candidates - t))])
+
+def _format(epoch_seconds):
+    return datetime.fromtimestamp(epoch_seconds, timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List new moons, quarters and full moons between two dates.")
+    parser.add_argument("start", help="Start date, e.g. 2024-01-01")
+    parser.add_argument("stop", help="End date (exclusive)")
+    parser.add_argument("--phase", choices=("all",) + tuple(PHASES), default="all")
+    parser.add_argument("--count", action="store_true", help="Only print the number of events and the search time")
+    args = parser.parse_args(argv)
+
+    start, stop = (np.datetime64(value) for value in (args.start, args.stop))
+    started = time.perf_counter()
+    if args.phase == "all":
+        times, names = find_all_phases(start, stop)
+    else:
+        times = find_phases(start, stop, args.phase)
+        names = [args.phase] * len(times)
+    elapsed = time.perf_counter() - started
+    if not args.count:
+        for when, name in zip(times, names):
+            print(f"{_format(when)}  {name}")
+    print(f"{len(times)} events in {elapsed * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
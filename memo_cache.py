@@ -0,0 +1,256 @@
+import argparse
+import collections
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+import ephemeris
+from geocoding import CACHE_DIR
+
+# Two-tier memo cache for ephemeris results.
+# Series for a site are computed in blocks of one UTC day (BUCKET_SECONDS) on a fixed
+# step, and each block is keyed by (name, rounded latitude, rounded longitude, accuracy
+# tier, step, day). Blocks live in an in-process LRU and in a SQLite file under CACHE_DIR,
+# so a year for a known site is read back as 365 rows instead of being recomputed, by this
+# process or the next one. Both tiers are bounded in bytes and drop the least recently
+# used blocks first; blocks from another ephemeris.MODEL_VERSION are deleted when the
+# file is opened. Sites are rounded to SITE_DECIMALS (about 10 m) and blocks computed at
+# the rounded site, so nearby sites share blocks.
+#
+# SOLARSYSTEM_MEMO=0 turns the shared cache off; SOLARSYSTEM_MEMO_MB sets its disk budget.
+
+DEFAULT_MEMO_PATH = os.path.join(CACHE_DIR, "memo.sqlite3")
+SITE_DECIMALS = 4
+BUCKET_SECONDS = 86400
+MEMORY_BYTES = 256 << 20
+DISK_BYTES = int(float(os.environ.get("SOLARSYSTEM_MEMO_MB", "1024")) * (1 << 20))
+EVICT_TO = 0.9  # Disk eviction trims to this fraction of the budget, so it does not run on every write
+COMPUTE_ROWS = 1 << 18  # Missing blocks are computed this many samples at a time
+SQL_VARIABLES = 500  # Keys per SELECT, below SQLite's parameter limit
+
+# Cache key for a tuple of parts
+def memo_key(*parts):
+    return "|".join(str(part) for part in parts)
+
+# Arrays by string key: in-process LRU in front of a SQLite store
+class MemoCache:
+    def __init__(self, path=DEFAULT_MEMO_PATH, memory_bytes=MEMORY_BYTES, disk_bytes=DISK_BYTES, model_version=None):
+        self.path = path
+        self.model_version = model_version or ephemeris.MODEL_VERSION
+        self.memory = collections.OrderedDict()
+        self.memory_bytes = memory_bytes
+        self.memory_used = 0
+        self.disk_bytes = disk_bytes
+        self.disk_used = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "memory_evictions": 0, "disk_evictions": 0,
+                      "invalidated": 0}
+        self.lock = threading.Lock()
+        self.connection = None
+        if path:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS memo ("
+                "key TEXT PRIMARY KEY, version TEXT, dtype TEXT, shape TEXT, nbytes INTEGER, accessed REAL, data BLOB)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS memo_accessed ON memo (accessed)")
+            # Results of another model version are stale
+            self.stats["invalidated"] = self.connection.execute("DELETE FROM memo WHERE version != ?", (self.model_version,)).rowcount
+            self.connection.commit()
+            self.disk_used = self.connection.execute("SELECT COALESCE(SUM(nbytes), 0) FROM memo").fetchone()[0]
+
+    def _remember(self, key, value):
+        if key in self.memory:
+            self.memory_used -= self.memory.pop(key).nbytes
+        self.memory[key] = value
+        self.memory_used += value.nbytes
+        while self.memory_used > self.memory_bytes and self.memory:
+            self.memory_used -= self.memory.popitem(last=False)[1].nbytes
+            self.stats["memory_evictions"] += 1
+
+    # {key: array} for the keys found in either tier; arrays are read-only and shared
+    def get_many(self, keys):
+        found = {}
+        with self.lock:
+            pending = []
+            for key in keys:
+                if key in self.memory:
+                    self.memory.move_to_end(key)
+                    found[key] = self.memory[key]
+                else:
+                    pending.append(key)
+            self.stats["memory_hits"] += len(found)
+            if pending and self.connection is not None:
+                rows = []
+                for first in range(0, len(pending), SQL_VARIABLES):
+                    chunk = pending[first:first + SQL_VARIABLES]
+                    rows += self.connection.execute(
+                        f"SELECT key, dtype, shape, data FROM memo WHERE version = ? AND key IN ({','.join('?' * len(chunk))})",
+                        [self.model_version, *chunk]).fetchall()
+                for key, dtype, shape, data in rows:
+                    value = np.frombuffer(data, dtype=dtype).reshape([int(size) for size in shape.split(",") if size])
+                    self._remember(key, value)
+                    found[key] = value
+                if rows:
+                    now = time.time()
+                    self.connection.executemany("UPDATE memo SET accessed = ? WHERE key = ?", [(now, row[0]) for row in rows])
+                    self.connection.commit()
+                self.stats["disk_hits"] += len(rows)
+            self.stats["misses"] += len(keys) - len(found)
+        return found
+
+    # Store {key: array} in both tiers (one transaction for the disk)
+    def put_many(self, items):
+        with self.lock:
+            rows = []
+            now = time.time()
+            for key, value in items.items():
+                value = np.ascontiguousarray(value)
+                value.flags.writeable = False
+                self._remember(key, value)
+                rows.append((key, self.model_version, value.dtype.str, ",".join(map(str, value.shape)), value.nbytes, now,
+                             value.tobytes()))
+            if rows and self.connection is not None:
+                replaced = self._disk_sizes([row[0] for row in rows])
+                self.connection.executemany("INSERT OR REPLACE INTO memo VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                self.connection.commit()
+                self.disk_used += sum(row[4] for row in rows) - replaced
+                if self.disk_used > self.disk_bytes:
+                    self._evict_disk()
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def put(self, key, value):
+        self.put_many({key: value})
+
+    def _disk_sizes(self, keys):
+        total = 0
+        for first in range(0, len(keys), SQL_VARIABLES):
+            chunk = keys[first:first + SQL_VARIABLES]
+            total += self.connection.execute(f"SELECT COALESCE(SUM(nbytes), 0) FROM memo WHERE key IN ({','.join('?' * len(chunk))})",
+                                             chunk).fetchone()[0]
+        return total
+
+    # Delete the least recently used rows until the disk tier is EVICT_TO of its budget
+    def _evict_disk(self):
+        excess = self.disk_used - int(self.disk_bytes * EVICT_TO)
+        victims = []
+        for key, nbytes in self.connection.execute("SELECT key, nbytes FROM memo ORDER BY accessed"):
+            if excess <= 0:
+                break
+            victims.append((key,))
+            excess -= nbytes
+            self.disk_used -= nbytes
+        self.connection.executemany("DELETE FROM memo WHERE key = ?", victims)
+        self.connection.commit()
+        self.stats["disk_evictions"] += len(victims)
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+            self.memory_used = 0
+            if self.connection is not None:
+                self.connection.execute("DELETE FROM memo")
+                self.connection.commit()
+                self.connection.execute("VACUUM")
+            self.disk_used = 0
+
+    # Counters plus the size of each tier
+    def summary(self):
+        with self.lock:
+            disk_entries = self.connection.execute("SELECT COUNT(*) FROM memo").fetchone()[0] if self.connection is not None else 0
+            lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            return dict(self.stats, hit_rate=(lookups - self.stats["misses"]) / lookups if lookups else None,
+                        memory_entries=len(self.memory), memory_bytes=self.memory_used, disk_entries=disk_entries,
+                        disk_bytes=self.disk_used, path=self.path, model_version=self.model_version)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+_default_cache = None
+
+# The shared cache (None when SOLARSYSTEM_MEMO=0); memory only if the file cannot be opened
+def get_memo_cache():
+    global _default_cache
+    if _default_cache is None and os.environ.get("SOLARSYSTEM_MEMO", "1") != "0":
+        try:
+            _default_cache = MemoCache()
+        except (sqlite3.Error, OSError):
+            _default_cache = MemoCache(path=None)
+    return _default_cache
+
+# function(times, latitude, longitude, accuracy) -> tuple of arrays, evaluated at
+# start + i * step_seconds for i < count through the cache, one day block at a time.
+# `name` identifies the function in the keys; returns the tuple of arrays. Without a
+# cache the function gets the exact site, with one the site rounded for the keys.
+def site_series(cache, name, function, latitude, longitude, start, count, step_seconds=60, accuracy="fast"):
+    start = float(start)
+    if cache is None or BUCKET_SECONDS % step_seconds or count <= 0:
+        return function(start + np.arange(count) * step_seconds, latitude, longitude, accuracy)
+    latitude, longitude = round(float(latitude), SITE_DECIMALS), round(float(longitude), SITE_DECIMALS)
+    per_bucket = int(BUCKET_SECONDS // step_seconds)
+    phase = start % step_seconds
+    first_bucket = int((start - phase) // BUCKET_SECONDS)
+    offset = int(round((start - phase) / step_seconds)) - first_bucket * per_bucket
+    buckets = list(range(first_bucket, first_bucket + -(-(offset + count) // per_bucket)))
+    keys = [memo_key(name, latitude, longitude, accuracy, step_seconds, phase, bucket) for bucket in buckets]
+    found = cache.get_many(keys)
+
+    missing = [bucket for bucket, key in zip(buckets, keys) if key not in found]
+    group = max(1, COMPUTE_ROWS // per_bucket)
+    for first in range(0, len(missing), group):
+        days = np.array(missing[first:first + group])
+        times = (days[:, np.newaxis] * BUCKET_SECONDS + phase + np.arange(per_bucket) * step_seconds).ravel()
+        blocks = np.stack(function(times, latitude, longitude, accuracy)).reshape(-1, len(days), per_bucket)
+        computed = {memo_key(name, latitude, longitude, accuracy, step_seconds, phase, day): blocks[:, index]
+                    for index, day in enumerate(days.tolist())}
+        cache.put_many(computed)
+        found.update(computed)
+
+    series = np.concatenate([found[key] for key in keys], axis=1)[:, offset:offset + count]
+    return tuple(series)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or clear the persistent ephemeris memo cache.")
+    parser.add_argument("--path", default=DEFAULT_MEMO_PATH, help="SQLite file of the cache")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Entries, size and model version")
+    commands.add_parser("clear", help="Delete every cached result")
+    warm = commands.add_parser("warm", help="Compute and store Sun/Moon tracks for a site")
+    warm.add_argument("--lat", type=float, required=True)
+    warm.add_argument("--lon", type=float, required=True)
+    warm.add_argument("--start", required=True, help="ISO date, e.g. 2024-01-01")
+    warm.add_argument("--stop", required=True, help="ISO date, e.g. 2025-01-01")
+    warm.add_argument("--step", type=float, default=60, help="Seconds between samples")
+    warm.add_argument("--accuracy", choices=ephemeris.ACCURACY_TIERS, default="fast")
+    args = parser.parse_args(argv)
+
+    cache = MemoCache(args.path)
+    if args.command == "clear":
+        cache.clear()
+        print(f"Cleared {args.path}")
+    elif args.command == "warm":
+        from tracks import compute_track
+
+        started = time.perf_counter()
+        for body in ("sun", "moon"):
+            compute_track(body, args.lat, args.lon, np.datetime64(args.start), np.datetime64(args.stop), args.step,
+                          accuracy=args.accuracy, cache=cache)
+        summary = cache.summary()
+        print(f"Stored {summary['misses']} blocks ({summary['memory_hits'] + summary['disk_hits']} already cached) "
+              f"in {time.perf_counter() - started:.2f}s")
+    else:
+        summary = cache.summary()
+        print(f"{summary['path']}: {summary['disk_entries']} blocks, {summary['disk_bytes'] / (1 << 20):.1f} MB "
+              f"of {cache.disk_bytes / (1 << 20):.0f} MB, model version {summary['model_version']}")
+    cache.close()
+
+if __name__ == "__main__":
+    main()
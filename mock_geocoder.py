@@ -0,0 +1,85 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from geocoding import load_gazetteer, normalize_name
+
+# Local stand-in for the Nominatim /search endpoint.
+# Answers from the bundled gazetteer (or any {name: (lat, lon, ...)} dict) so tests and
+# benchmarks can exercise the online code path without touching the real service.
+# fail_rate makes that fraction of requests answer 503, to exercise retries.
+
+class MockNominatimHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/search":
+            self.send_error(404)
+            return
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+        if server.delay:
+            time.sleep(server.delay)
+        with server.lock:
+            failing = server.random.random() < server.fail_rate
+            server.failure_count += failing
+        if failing:
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        query = parse_qs(url.query).get("q", [""])[0]
+        place = server.places.get(normalize_name(query))
+        results = []
+        if place is not None:
+            results.append({"lat": str(place[0]), "lon": str(place[1]), "display_name": query})
+
+        body = json.dumps(results).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+# Start the stand-in server on a background thread; port 0 picks a free port.
+# Point a Geocoder at it with nominatim_url=server.url.
+def start_server(places=None, host="127.0.0.1", port=0, delay=0.0, fail_rate=0.0, seed=0):
+    server = ThreadingHTTPServer((host, port), MockNominatimHandler)
+    server.places = load_gazetteer() if places is None else {normalize_name(k): v for k, v in places.items()}
+    server.delay = delay
+    server.fail_rate = fail_rate
+    server.random = random.Random(seed)
+    server.request_count = 0
+    server.failure_count = 0
+    server.lock = threading.Lock()
+    server.url = f"http://{host}:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local Nominatim-compatible geocoding server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--delay", type=float, default=0.0, help="Artificial latency per request in seconds")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    args = parser.parse_args(argv)
+
+    server = start_server(host=args.host, port=args.port, delay=args.delay, fail_rate=args.fail_rate)
+    print(f"Mock geocoder listening on {server.url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import argparse
+import collections
+import functools
+import json
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from geocoding import parse_coordinates
+from instrumentation import prometheus_family, prometheus_text, span
+from positions import ACCURACY_TIERS, MODELS, SITE_DECIMALS, compute_answer, parse_time
+
+# Long-running HTTP/JSON service for Sun and Moon position queries.
+# The process stays up, so the geocoder (with its gazetteer and SQLite cache), any
+# precomputed site tables and an LRU cache of recent answers stay warm between
+# requests. Answers are keyed by (rounded site, time bucket, model), so repeated
+# questions about the same place and minute are served from memory.
+#
+#   GET  /position?location=Hyderabad&time=2024-11-15T12:00:00Z&model=sky&accuracy=precise
+#   POST /batch     {"queries": [{"location": ..., "time": ..., "model": ...}, ...]}
+#   GET  /stats     request count, cache hits and p50/p99 latency
+#   GET  /metrics   the same counters plus per-stage timings, in Prometheus text format
+#   GET  /health
+
+DEFAULT_BUCKET_SECONDS = 60
+DEFAULT_CACHE_SIZE = 100000
+LATENCY_WINDOW = 10000
+MAX_BATCH = 10000
+
+# Explicit latitude/longitude as floats, rejecting non-numbers, NaN/inf and values out of range
+def checked_site(latitude, longitude):
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        raise ValueError(f"'lat' and 'lon' must be numbers, not {latitude!r}, {longitude!r}") from None
+    if not (math.isfinite(latitude) and math.isfinite(longitude)):
+        raise ValueError("'lat' and 'lon' must be finite")
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError(f"Coordinates out of range: lat {latitude} (-90 to 90), lon {longitude} (-180 to 180)")
+    return latitude, longitude
+
+# Warm state shared by all request threads
+class PositionService:
+    def __init__(self, geocoder=None, tables=(), bucket_seconds=DEFAULT_BUCKET_SECONDS, cache_size=DEFAULT_CACHE_SIZE):
+        if geocoder is None:
+            from geocoding import get_geocoder
+
+            geocoder = get_geocoder()
+        self.geocoder = geocoder
+        self.tables = tuple(tables)
+        self.bucket_seconds = bucket_seconds
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.cached_answer = functools.lru_cache(maxsize=cache_size)(self._answer)
+
+    def _answer(self, latitude, longitude, bucket, model, accuracy):
+        return compute_answer(latitude, longitude, bucket * self.bucket_seconds, model, self.tables, accuracy)
+
+    # Coordinates for a query: explicit lat/lon, or a place name / "lat,lon" string
+    def resolve(self, query):
+        if query.get("lat") is not None and query.get("lon") is not None:
+            return checked_site(query["lat"], query["lon"])
+        location = query.get("location")
+        if not location:
+            raise ValueError("Query needs 'location' or 'lat' and 'lon'")
+        coordinates = parse_coordinates(location)
+        if coordinates is not None:
+            return coordinates
+        with span("geocode"):
+            return self.geocoder.lookup(location)
+
+    def answer(self, query):
+        latitude, longitude = self.resolve(query)
+        epoch_seconds = parse_time(query.get("time"))
+        model = query.get("model", "sky")
+        if model not in MODELS:
+            raise ValueError(f"Unknown model {model!r}; expected one of {', '.join(MODELS)}")
+        accuracy = query.get("accuracy", "fast")
+        if accuracy not in ACCURACY_TIERS:
+            raise ValueError(f"Unknown accuracy {accuracy!r}; expected one of {', '.join(ACCURACY_TIERS)}")
+        bucket = int(epoch_seconds // self.bucket_seconds)
+        answer = self.cached_answer(round(latitude, SITE_DECIMALS), round(longitude, SITE_DECIMALS), bucket, model, accuracy)
+        bucket_time = datetime.fromtimestamp(bucket * self.bucket_seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return dict(answer, latitude=latitude, longitude=longitude, time=bucket_time, model=model, accuracy=accuracy)
+
+    # Answer many queries; a failed query reports its error without failing the batch
+    def answer_batch(self, queries):
+        results = []
+        for query in queries:
+            if not isinstance(query, dict):
+                results.append({"error": f"Each query must be a JSON object, not {type(query).__name__}"})
+                continue
+            try:
+                results.append(self.answer(query))
+            except Exception as e:
+                results.append({"error": str(e)})
+        return results
+
+    def record(self, seconds):
+        with self.lock:
+            self.requests += 1
+            self.latencies.append(seconds)
+
+    def stats(self):
+        with self.lock:
+            latencies = np.array(self.latencies) * 1000
+            requests = self.requests
+        cache = self.cached_answer.cache_info()
+        return {
+            "requests": requests,
+            "latency_ms": {
+                "p50": float(np.percentile(latencies, 50)) if len(latencies) else None,
+                "p99": float(np.percentile(latencies, 99)) if len(latencies) else None,
+                "window": len(latencies),
+            },
+            "cache": {"hits": cache.hits, "misses": cache.misses, "size": cache.currsize, "max_size": cache.maxsize},
+            "geocoder": dict(self.geocoder.stats),
+            "tables": [table.meta["name"] for table in self.tables],
+        }
+
+    # Service counters and stage timings (geocode, compute) in Prometheus text format
+    def metrics_text(self):
+        stats = self.stats()
+        cache = stats["cache"]
+        text = prometheus_family("solarsystem_requests_total", "counter", "Requests answered", [({}, stats["requests"])])
+        for quantile in ("p50", "p99"):
+            if stats["latency_ms"][quantile] is not None:
+                text += prometheus_family(f"solarsystem_request_latency_{quantile}_seconds", "gauge",
+                                          f"{quantile} request latency over the last {LATENCY_WINDOW} requests",
+                                          [({}, stats["latency_ms"][quantile] / 1000)])
+        text += prometheus_family("solarsystem_answer_cache_total", "counter", "Answer cache lookups",
+                                  [({"result": "hit"}, cache["hits"]), ({"result": "miss"}, cache["misses"])])
+        text += prometheus_family("solarsystem_answer_cache_size", "gauge", "Answers held in the cache", [({}, cache["size"])])
+        text += prometheus_family("solarsystem_geocoder_lookups_total", "counter", "Geocoder lookups by source",
+                                  [({"source": source}, count) for source, count in stats["geocoder"].items()])
+        return text + prometheus_text()
+
+class PositionRequestHandler(BaseHTTPRequestHandler):
+    # Strict JSON: an answer holding NaN or infinity is a server error, not a bare NaN token
+    def send_json(self, status, payload):
+        try:
+            body = json.dumps(payload, allow_nan=False).encode("utf-8")
+        except ValueError:
+            status, body = 500, json.dumps({"error": "Answer holds non-finite numbers"}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        started = time.perf_counter()
+        url = urlparse(self.path)
+        service = self.server.service
+        path = url.path.rstrip("/")
+        if path == "/health":
+            self.send_json(200, {"status": "ok"})
+            return
+        if path == "/stats":
+            self.send_json(200, service.stats())
+            return
+        if path == "/metrics":
+            body = service.metrics_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if path != "/position":
+            self.send_json(404, {"error": f"Unknown path {url.path}"})
+            return
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        try:
+            answer = service.answer(query)
+        except (ValueError, TypeError) as e:
+            self.send_json(400, {"error": str(e)})
+        except Exception as e:
+            self.send_json(500, {"error": str(e)})
+        else:
+            self.send_json(200, answer)
+        service.record(time.perf_counter() - started)
+
+    def do_POST(self):
+        started = time.perf_counter()
+        service = self.server.service
+        if urlparse(self.path).path.rstrip("/") != "/batch":
+            self.send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            queries = payload["queries"] if isinstance(payload, dict) else payload
+            if not isinstance(queries, list):
+                raise ValueError("'queries' must be a list of query objects")
+            if len(queries) > MAX_BATCH:
+                raise ValueError(f"At most {MAX_BATCH} queries per batch")
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        self.send_json(200, {"results": service.answer_batch(queries)})
+        service.record(time.perf_counter() - started)
+
+    def log_message(self, format, *args):
+        pass
+
+# Start the service on a background thread; port 0 picks a free port
+def start_server(service=None, host="127.0.0.1", port=0):
+    server = ThreadingHTTPServer((host, port), PositionRequestHandler)
+    server.service = service or PositionService()
+    server.url = f"http://{host}:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Sun and Moon positions over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--bucket", type=float, default=DEFAULT_BUCKET_SECONDS, help="Seconds per cached time bucket")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE, help="Answers kept in the LRU cache")
+    parser.add_argument("--table", action="append", default=[], help="Precomputed site table to keep loaded (repeatable)")
+    args = parser.parse_args(argv)
+
+    from lookup_tables import SiteTable
+
+    tables = [SiteTable(name) for name in args.table]
+    stale = [table.meta["name"] for table in tables if not table.is_current()]
+    if stale:
+        print(f"Ignoring tables built by an older model: {', '.join(stale)}")
+        tables = [table for table in tables if table.is_current()]
+    service = PositionService(tables=tables, bucket_seconds=args.bucket, cache_size=args.cache_size)
+    server = ThreadingHTTPServer((args.host, args.port), PositionRequestHandler)
+    server.service = service
+    print(f"Serving Sun and Moon positions on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(service.stats()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import time
+
+import numpy as np
+
+from ephemeris import (ACCURACY_TIERS, sun_altaz, moon_altaz, to_epoch_seconds, daily_sun_xy, daily_moon_xy,
+                       daily_sun_angles, daily_moon_angles, sun_and_moon_positions)
+from instrumentation import span
+from timescale import local_hours
+
+# Single-instant Sun and Moon answers shared by the position service and the CLI.
+# Kept free of server and plotting imports so a one-off text answer starts quickly.
+
+# sky = real azimuth/altitude; the others are the scripts' illustrative models:
+# positions = 2Dpositions.py, angles = SunandMoon.py, simulation = FinalVersionWorking.py
+MODELS = ("sky", "positions", "angles", "simulation")
+SITE_DECIMALS = 4  # About 10 m; finer differences share a cache entry
+
+# Local hour the scripts feed into their models (the site's time zone)
+def model_hour(epoch_seconds, latitude, longitude):
+    return local_hours(epoch_seconds, latitude, longitude)
+
+# Answer one (site, instant, model) question as a JSON-ready dict. `accuracy` picks the
+# ephemeris tier of the sky model; site tables hold fast-tier positions only.
+@span("compute")
+def compute_answer(latitude, longitude, epoch_seconds, model, tables=(), accuracy="fast"):
+    if accuracy not in ACCURACY_TIERS:
+        raise ValueError(f"Unknown accuracy {accuracy!r}; expected one of {', '.join(ACCURACY_TIERS)}")
+    if model == "sky":
+        for table in tables if accuracy == "fast" else ():
+            if (round(table.latitude, SITE_DECIMALS), round(table.longitude, SITE_DECIMALS)) == (latitude, longitude) \
+                    and table.covers(epoch_seconds):
+                sun_azimuth, sun_altitude, moon_azimuth, moon_altitude = (float(value) for value in table.lookup(epoch_seconds))
+                break
+        else:
+            sun_azimuth, sun_altitude = (float(value) for value in sun_altaz(epoch_seconds, latitude, longitude, accuracy))
+            moon_azimuth, moon_altitude = (float(value) for value in moon_altaz(epoch_seconds, latitude, longitude, accuracy))
+        return {"sun": {"azimuth": sun_azimuth, "altitude": sun_altitude},
+                "moon": {"azimuth": moon_azimuth, "altitude": moon_altitude}}
+
+    hour = float(model_hour(epoch_seconds, latitude, longitude))
+    if model == "positions":
+        (sun_x, sun_y), (moon_x, moon_y) = daily_sun_xy(hour, latitude), daily_moon_xy(hour)
+        return {"hour": hour, "sun": {"x": float(sun_x), "y": float(sun_y)}, "moon": {"x": float(moon_x), "y": float(moon_y)}}
+    if model == "angles":
+        (sun_azimuth, sun_altitude), (moon_azimuth, moon_altitude) = daily_sun_angles(hour, latitude), daily_moon_angles(hour)
+    elif model == "simulation":
+        sun_azimuth, sun_altitude, moon_azimuth, moon_altitude = sun_and_moon_positions(hour, latitude)
+    else:
+        raise ValueError(f"Unknown model {model!r}; expected one of {', '.join(MODELS)}")
+    return {"hour": hour,
+            "sun": {"azimuth": float(sun_azimuth), "altitude": float(sun_altitude)},
+            "moon": {"azimuth": float(moon_azimuth), "altitude": float(moon_altitude)}}
+
+# Parse a query time: ISO 8601 (UTC, optional Z), epoch seconds, or "now"
+def parse_time(value):
+    if value in (None, "", "now"):
+        return time.time()
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        return float(to_epoch_seconds(np.datetime64(value.rstrip("Z"))))
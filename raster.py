@@ -0,0 +1,246 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import ephemeris
+from ephemeris import SECONDS_PER_DAY, equation_of_time, greenwich_sidereal_time, moon_equatorial, sun_equatorial, to_epoch_seconds
+
+# Sky-coverage rasters over a latitude x longitude grid, one value per cell and local day:
+#   daylight_hours  hours with the Sun's centre above -0.833 degrees (refraction + semi-diameter)
+#   noon_altitude   the Sun's altitude at local apparent noon (degrees)
+#   moon_above      fraction of the day with the Moon above its standard horizon
+#
+# The Sun's and Moon's RA/Dec and the sidereal time do not depend on the site, so they
+# are computed once per time sample for the whole run. At one sample a latitude row sees
+# the body above the horizon on a single arc of longitudes around the body's transit
+# longitude, |lon - transit| < H0(lat, dec), so a row's daily counts are built by adding
+# +1/-1 at the arc ends of every sample and taking one cumulative sum along longitude. The
+# result equals testing every lat x lon x sample cell, at the cost of lat x samples
+# arccos evaluations plus one pass over the output. Each arc is split at the longitude
+# where the sample crosses local midnight, so days are local mean solar days.
+#
+# Rows are processed in tiles sized to a fixed buffer, spread over a process pool, and
+# written straight into memory-mapped .npy files (days, lat, lon) with a JSON sidecar, so
+# the output can be much larger than memory.
+
+METRICS = ("daylight_hours", "noon_altitude", "moon_above")
+HORIZON_ALTITUDE = {"sun": -0.8333, "moon": 0.125}  # As in rise_set.py; the Moon's includes its mean parallax
+COUNTED = {"daylight_hours": "sun", "moon_above": "moon"}
+WORLD = (-90.0, -180.0, 90.0, 180.0)  # south, west, north, east
+DEFAULT_RESOLUTION = 0.1
+DEFAULT_STEP = 300.0
+TILE_BYTES = 64 << 20  # Daily count buffer of one tile
+SAMPLE_CHUNK = 1 << 20  # Rows x samples evaluated at a time
+META_NAME = "raster.json"
+
+_worker = {}
+
+# Cell-centre latitudes and longitudes of a grid over (south, west, north, east)
+def grid_axes(resolution, bounds=WORLD):
+    south, west, north, east = bounds
+    if not (-90 <= south < north <= 90 and -180 <= west < east <= 180):
+        raise ValueError(f"Bad bounds {bounds}; expected south < north in [-90, 90] and west < east in [-180, 180]")
+    rows = int(round((north - south) / resolution))
+    columns = int(round((east - west) / resolution))
+    return south + (np.arange(rows) + 0.5) * resolution, west + (np.arange(columns) + 0.5) * resolution
+
+# Sample midpoints covering every local day of every longitude: UTC from start - 12 h
+# to start + days + 12 h
+def sample_times(start, days, step):
+    count = int(np.ceil((days + 1) * SECONDS_PER_DAY / step))
+    return start - SECONDS_PER_DAY / 2 + (np.arange(count) + 0.5) * step
+
+# Longitude (wrapped to [-180, 180)) where the body transits at each time, and its declination
+def transit_longitudes(equatorial, times):
+    right_ascension, declination = equatorial(times)
+    return np.mod(right_ascension - greenwich_sidereal_time(times) + 180, 360) - 180, declination
+
+# Declination of the Sun at local apparent noon of each day (rows) and longitude (columns)
+def noon_declinations(start, days, longitudes):
+    noons = start + (np.arange(days) + 0.5) * SECONDS_PER_DAY
+    equation = equation_of_time(noons) * 60  # Seconds; varies slowly enough to take once per day
+    times = noons[:, None] - longitudes[None, :] * (SECONDS_PER_DAY / 360) - equation[:, None]
+    return sun_equatorial(times)[1]
+
+# Half width (degrees) of the arc of hour angles with the body above `altitude`:
+# 0 when it stays below, 180 when it stays above
+def above_half_width(latitude, declination, altitude):
+    lat = np.radians(latitude)
+    dec = np.radians(declination)
+    cos_h0 = (np.sin(np.radians(altitude)) - np.sin(lat) * np.sin(dec)) / (np.cos(lat) * np.cos(dec))
+    return np.degrees(np.arccos(np.clip(cos_h0, -1, 1)))
+
+# Samples per local day with the body above the horizon: (rows, days, columns) int32
+def count_above(latitudes, west, resolution, columns, start, days, times, transit, declination, altitude):
+    rows = len(latitudes)
+    first_centre = west + resolution / 2  # Column j covers the cell centred at first_centre + j * resolution
+    slots = days + 2  # Local days -1 and `days` catch the ends of the sample range and are dropped
+    size = rows * slots * (columns + 1)
+    diff = np.zeros(size, dtype=np.int64)
+    row_base = (np.arange(rows) * slots)[:, None]
+    per_chunk = max(1, SAMPLE_CHUNK // rows)
+    for first in range(0, len(times), per_chunk):
+        t = times[first:first + per_chunk]
+        half = above_half_width(latitudes[:, None], declination[None, first:first + per_chunk], altitude)
+        low = transit[first:first + per_chunk] - half
+        high = transit[first:first + per_chunk] + half
+        # Local day at longitude -180 and the grid column where local midnight passes
+        since = t - start - SECONDS_PER_DAY / 2
+        day = np.floor(since / SECONDS_PER_DAY)
+        midnight = -180 + ((day + 1) * SECONDS_PER_DAY - since) * (360 / SECONDS_PER_DAY)
+        split = np.clip(np.ceil((midnight - first_centre) / resolution), 0, columns).astype(np.int64)
+        day = day.astype(np.int64)
+        starts, stops = [], []
+        for shift in (-360.0, 0.0, 360.0):
+            begin = np.clip(np.ceil((low + shift - first_centre) / resolution), 0, columns).astype(np.int64)
+            end = np.clip(np.ceil((high + shift - first_centre) / resolution), 0, columns).astype(np.int64)
+            for part_begin, part_end, part_day in ((begin, np.minimum(end, split), day), (np.maximum(begin, split), end, day + 1)):
+                base = (row_base + np.clip(part_day + 1, 0, slots - 1)) * (columns + 1)
+                starts.append((base + part_begin).ravel())
+                stops.append((base + np.maximum(part_end, part_begin)).ravel())
+        diff += np.bincount(np.concatenate(starts), minlength=size)
+        diff -= np.bincount(np.concatenate(stops), minlength=size)
+    counts = np.cumsum(diff.reshape(rows, slots, columns + 1), axis=2, out=diff.reshape(rows, slots, columns + 1))
+    return counts[:, 1:days + 1, :columns].astype(np.int32)
+
+# Runs once in every worker process (and in-process for a single worker)
+def _init_worker(setup, paths):
+    _worker.clear()
+    _worker.update(setup)
+    _worker["outputs"] = {metric: np.load(path, mmap_mode="r+") for metric, path in paths.items()}
+
+# Compute and store one tile of latitude rows
+def _compute_tile(rows):
+    w = _worker
+    latitudes = w["latitudes"][rows]
+    for metric, output in w["outputs"].items():
+        if metric == "noon_altitude":
+            daily = 90 - np.abs(latitudes[:, None, None] - w["noon_declination"][None, :, :])
+        else:
+            body = COUNTED[metric]
+            counts = count_above(latitudes, w["west"], w["resolution"], len(w["longitudes"]), w["start"], w["days"],
+                                 w["times"], w["transit"][body], w["declination"][body], HORIZON_ALTITUDE[body])
+            scale = w["step"] / 3600 if metric == "daylight_hours" else w["step"] / SECONDS_PER_DAY
+            daily = counts * np.float32(scale)
+        if w["daily"]:
+            output[:, rows] = daily.transpose(1, 0, 2)
+        else:
+            output[rows] = daily.mean(axis=1)
+    return rows.stop - rows.start
+
+# Paths of a raster's metric files and metadata
+def raster_paths(output_dir, metrics):
+    return {metric: os.path.join(output_dir, metric + ".npy") for metric in metrics}, os.path.join(output_dir, META_NAME)
+
+# Compute the requested metrics for every cell of the grid over `days` local days from
+# `start` (UTC midnight of the first day). daily=False stores the mean over the days.
+def compute_raster(output_dir, metrics=METRICS, start="2025-01-01", days=365, resolution=DEFAULT_RESOLUTION, bounds=WORLD,
+                   step=DEFAULT_STEP, daily=False, workers=None, report=print):
+    unknown = set(metrics) - set(METRICS)
+    if unknown:
+        raise ValueError(f"Unknown metrics {', '.join(sorted(unknown))}; expected some of {', '.join(METRICS)}")
+    started = time.perf_counter()
+    start = float(to_epoch_seconds(np.datetime64(start, "s") if isinstance(start, str) else start))
+    latitudes, longitudes = grid_axes(resolution, bounds)
+    setup = {"latitudes": latitudes, "longitudes": longitudes, "west": bounds[1], "resolution": resolution,
+             "start": start, "days": days, "step": step, "daily": daily, "transit": {}, "declination": {}}
+    bodies = sorted({COUNTED[metric] for metric in metrics if metric in COUNTED})
+    if bodies:
+        setup["times"] = sample_times(start, days, step)
+    for body in bodies:
+        equatorial = sun_equatorial if body == "sun" else moon_equatorial
+        setup["transit"][body], setup["declination"][body] = transit_longitudes(equatorial, setup["times"])
+    if "noon_altitude" in metrics:
+        setup["noon_declination"] = noon_declinations(start, days, longitudes)
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths, meta_path = raster_paths(output_dir, metrics)
+    shape = (days, len(latitudes), len(longitudes)) if daily else (len(latitudes), len(longitudes))
+    for path in paths.values():
+        np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=shape).flush()  # Workers reopen it
+
+    # Tiles of whole rows, small enough for the count buffer and numerous enough to balance the pool
+    workers = workers or os.cpu_count() or 1
+    row_bytes = (days + 2) * (len(longitudes) + 1) * 8
+    tile_rows = max(1, min(TILE_BYTES // row_bytes, -(-len(latitudes) // (4 * workers))))
+    tiles = [slice(first, min(first + tile_rows, len(latitudes))) for first in range(0, len(latitudes), tile_rows)]
+    done = 0
+    if workers == 1:
+        _init_worker(setup, paths)
+        results = map(_compute_tile, tiles)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(setup, paths))
+        results = pool.map(_compute_tile, tiles)
+    try:
+        for finished, rows in enumerate(results, 1):
+            done += rows
+            elapsed = time.perf_counter() - started
+            if report and (finished % max(1, len(tiles) // 20) == 0 or finished == len(tiles)):
+                report(f"[{done}/{len(latitudes)} rows] {done * len(longitudes) / elapsed:,.0f} cells/s, "
+                       f"ETA {elapsed / done * (len(latitudes) - done):.0f}s")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        _worker.clear()
+
+    meta = {
+        "metrics": list(metrics),
+        "bounds": list(bounds),
+        "resolution": resolution,
+        "shape": list(shape),
+        "axes": ["day", "latitude", "longitude"] if daily else ["latitude", "longitude"],
+        "start": start,
+        "days": days,
+        "step": step,
+        "daily": daily,
+        "seconds": time.perf_counter() - started,
+        "model_version": ephemeris.MODEL_VERSION,
+    }
+    with open(meta_path, "w") as handle:
+        json.dump(meta, handle, indent=2)
+    return meta
+
+# A stored raster: (metadata, {metric: read-only memory-mapped array})
+def load_raster(output_dir):
+    with open(os.path.join(output_dir, META_NAME)) as handle:
+        meta = json.load(handle)
+    paths, _ = raster_paths(output_dir, meta["metrics"])
+    return meta, {metric: np.load(path, mmap_mode="r") for metric, path in paths.items()}
+
+# "south,west,north,east"
+def parse_bounds(text):
+    values = tuple(float(value) for value in text.split(","))
+    if len(values) != 4:
+        raise argparse.ArgumentTypeError("expected south,west,north,east")
+    return values
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daylight hours, noon Sun altitude and Moon-above fraction over a lat/lon grid.")
+    parser.add_argument("--metric", action="append", choices=METRICS, help="Metric to compute (repeatable; default all)")
+    parser.add_argument("--start", default=f"{time.gmtime().tm_year}-01-01", help="First local day (UTC date)")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--resolution", type=float, default=DEFAULT_RESOLUTION, help="Cell size in degrees")
+    parser.add_argument("--bounds", type=parse_bounds, default=WORLD, help="south,west,north,east (default: whole world)")
+    parser.add_argument("--step", type=float, default=DEFAULT_STEP, help="Sample step in seconds for the counted metrics")
+    parser.add_argument("--daily", action="store_true", help="Store every day (days x lat x lon) instead of the mean")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per core)")
+    parser.add_argument("--output-dir", default="raster")
+    args = parser.parse_args(argv)
+
+    try:
+        meta = compute_raster(args.output_dir, args.metric or METRICS, args.start, args.days, args.resolution, args.bounds,
+                              args.step, args.daily, args.workers)
+    except ValueError as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+    cells = meta["shape"][-2] * meta["shape"][-1]
+    print(f"{cells:,} cells x {meta['days']} days in {meta['seconds']:.1f}s -> {args.output_dir}/ "
+          f"({', '.join(name + '.npy' for name in meta['metrics'])})")
+
+if __name__ == "__main__":
+    main()
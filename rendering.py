@@ -0,0 +1,153 @@
+import argparse
+import os
+import sys
+import time
+
+import matplotlib
+
+# Headless rendering: SOLARSYSTEM_HEADLESS=1 switches to the Agg backend (no GUI) and
+# turns plt.show() calls into no-ops, so the scripts can run on servers and in batches.
+HEADLESS = os.environ.get("SOLARSYSTEM_HEADLESS", "0") not in ("", "0")
+if HEADLESS:
+    matplotlib.use("Agg")
+
+import matplotlib.image
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from charts import AnnualPathsChart, FullMoonPathsChart
+from instrumentation import span
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+DEFAULT_DPI = 300
+NON_INTERACTIVE_BACKENDS = ("agg", "cairo", "pdf", "pgf", "ps", "svg", "template")
+DEFAULT_OUTPUT_SIZE = (3000, 3000)
+CHART_TYPES = ("annual", "kartheeka", "fullmoon")
+
+# Parse "WIDTHxHEIGHT" in pixels
+def parse_size(text):
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height or width)
+
+# Output size from SOLARSYSTEM_OUTPUT_SIZE, e.g. "2000x2000"
+def output_size():
+    value = os.environ.get("SOLARSYSTEM_OUTPUT_SIZE")
+    return parse_size(value) if value else DEFAULT_OUTPUT_SIZE
+
+# Figure size in inches that produces exactly width x height pixels at the given DPI
+def figure_size_for(width, height, dpi=DEFAULT_DPI):
+    return width / dpi, height / dpi
+
+# Save a figure as a PNG of the requested pixel size instead of a fixed figsize*dpi canvas.
+# Timed as "savefig", split into "savefig.render" (layout and rasterizing the artists)
+# and "savefig.encode" (PNG compression) when the figure can be drawn with Agg.
+def save_figure(fig, path, size=None, dpi=DEFAULT_DPI):
+    width, height = size or output_size()
+    fig.set_size_inches(*figure_size_for(width, height, dpi))
+    with span("savefig", path=path, width=width, height=height):
+        if type(fig.canvas) is FigureCanvasAgg:  # Interactive Agg canvases keep the plain savefig
+            _render_and_encode(fig, path, dpi)
+        else:
+            fig.savefig(path, format="png", dpi=dpi)
+
+# Draw the figure once at the output DPI and PNG-encode the pixel buffer; the same
+# pixels fig.savefig writes, with rendering and encoding timed separately
+def _render_and_encode(fig, path, dpi):
+    screen_dpi = fig.dpi
+    fig.dpi = dpi
+    try:
+        with span("savefig.render"):
+            fig.canvas.draw()
+            pixels = np.asarray(fig.canvas.buffer_rgba())
+        with span("savefig.encode"):
+            matplotlib.image.imsave(path, pixels, format="png", dpi=dpi)
+    finally:
+        fig.dpi = screen_dpi
+
+# Show the figure interactively, or just release it when running headless
+def show(fig=None):
+    with span("show"):
+        if HEADLESS or matplotlib.get_backend().lower() in NON_INTERACTIVE_BACKENDS:
+            plt.close(fig if fig is not None else "all")
+        else:
+            plt.show()
+
+# Peak resident memory of this process in MB
+def peak_memory_mb():
+    if resource is None:
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB on Linux
+
+# Build the reusable chart object for a chart type
+def make_chart(chart, size, dpi):
+    figsize = figure_size_for(*size, dpi)
+    if chart == "fullmoon":
+        return FullMoonPathsChart(figsize=figsize)
+    if chart == "kartheeka":
+        return AnnualPathsChart(figsize=figsize, moon_hour=12)
+    return AnnualPathsChart(figsize=figsize)
+
+# Draw one location onto an existing chart
+def draw_location(chart_object, chart, latitude, longitude, label):
+    if chart == "fullmoon":
+        chart_object.draw(latitude, longitude, label)
+        return
+    chart_object.draw(latitude, label)
+    if chart == "kartheeka":
+        chart_object.highlight_kartheeka_pournami()
+
+# Geocode, draw and save one location; returns its timing stats (None if not found)
+def render_location(chart_object, chart, location, output_dir, size=DEFAULT_OUTPUT_SIZE, dpi=DEFAULT_DPI):
+    from geocoding import resolve_location
+
+    started = time.perf_counter()
+    latitude, longitude = resolve_location(location)
+    if latitude is None:
+        return None
+    draw_location(chart_object, chart, latitude, longitude, location)
+    path = os.path.join(output_dir, f"{chart}_{slugify(location)}.png")
+    save_figure(chart_object.fig, path, size, dpi)
+    return {"location": location, "path": path, "seconds": time.perf_counter() - started, "peak_memory_mb": peak_memory_mb()}
+
+# Render several locations with one figure; returns per-image timing and memory stats
+def render_locations(locations, output_dir, chart="annual", size=DEFAULT_OUTPUT_SIZE, dpi=DEFAULT_DPI, report=print):
+    os.makedirs(output_dir, exist_ok=True)
+    chart_object = make_chart(chart, size, dpi)
+    stats = []
+    for location in locations:
+        result = render_location(chart_object, chart, location, output_dir, size, dpi)
+        if result is None:
+            report(f"Skipping {location}: location not found")
+            continue
+        stats.append(result)
+        report(f"{result['path']}: {result['seconds']:.2f}s, peak memory {result['peak_memory_mb']:.0f} MB")
+    plt.close(chart_object.fig)
+    return stats
+
+# File-name-safe version of a location
+def slugify(text):
+    return "".join(ch if ch.isalnum() else "_" for ch in text.strip().lower()).strip("_") or "location"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render path charts for several locations without a GUI.")
+    parser.add_argument("locations", nargs="+", help="Place names or 'latitude,longitude' pairs")
+    parser.add_argument("--output-dir", default="charts")
+    parser.add_argument("--chart", choices=CHART_TYPES, default="annual")
+    parser.add_argument("--size", type=parse_size, default=DEFAULT_OUTPUT_SIZE, help="Output size in pixels, e.g. 2000x2000")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    args = parser.parse_args(argv)
+
+    matplotlib.use("Agg")
+    stats = render_locations(args.locations, args.output_dir, args.chart, args.size, args.dpi)
+    if stats:
+        total = sum(item["seconds"] for item in stats)
+        print(f"Rendered {len(stats)} charts in {total:.2f}s ({total / len(stats):.2f}s per image, peak memory {peak_memory_mb():.0f} MB)")
+
+if __name__ == "__main__":
+    main()
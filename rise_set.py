@@ -0,0 +1,204 @@
+import argparse
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from ephemeris import SECONDS_PER_DAY, greenwich_sidereal_time, sun_equatorial, moon_equatorial, to_epoch_seconds
+
+# Rise, set and transit times for many sites and days at once.
+# The body's right ascension and declination do not depend on the site, so they are
+# computed once on an hourly grid covering the whole period and interpolated. Every
+# site x day then gets a transit (hour angle = 0) and a rise/set guess from the
+# horizon hour angle, and all of them are refined together by Newton steps on the
+# hour angle. Events are finally assigned to the local mean solar day they fall in,
+# so a Moon that skips a rise or set on some day simply gets NaN for it.
+
+BODIES = {"sun": sun_equatorial, "moon": moon_equatorial}
+
+# Standard altitude of the body's centre at rise/set (degrees): refraction and
+# semi-diameter for the Sun, and additionally the mean horizontal parallax for the Moon,
+# because moon_equatorial() is geocentric
+HORIZON_ALTITUDE = {"sun": -0.8333, "moon": 0.125}
+
+# Mean rate at which the body's hour angle grows (degrees per second)
+HOUR_ANGLE_RATE = {"sun": 360.0 / SECONDS_PER_DAY, "moon": 347.8 / SECONDS_PER_DAY}
+
+GRID_STEP_SECONDS = 3600.0
+ITERATIONS = 2
+POLISH_ITERATIONS = 2
+MAX_POLISH_STEP = 1800.0  # Seconds; keeps a grazing event from jumping to a neighbouring crossing
+EVENTS = ("rise", "transit", "set")
+
+# Wrap angles (degrees) into [-180, 180)
+def _wrap(angle):
+    return np.mod(angle + 180, 360) - 180
+
+# Right ascension / declination of a body on an hourly grid. The grid is uniform, so
+# interpolation indexes it directly instead of searching it
+class _Track:
+    def __init__(self, body, start, stop):
+        self.start = start
+        times = np.arange(start, stop + 2 * GRID_STEP_SECONDS, GRID_STEP_SECONDS)
+        right_ascension, declination = BODIES[body](times)
+        self.right_ascension = np.degrees(np.unwrap(np.radians(right_ascension)))
+        self.declination = declination
+
+    def at(self, t):
+        position = np.clip((t - self.start) / GRID_STEP_SECONDS, 0, len(self.declination) - 1.000001)
+        index = position.astype(np.int64)
+        fraction = position - index
+        right_ascension = self.right_ascension[index] + fraction * (self.right_ascension[index + 1] - self.right_ascension[index])
+        declination = self.declination[index] + fraction * (self.declination[index + 1] - self.declination[index])
+        return right_ascension, declination
+
+# Hour angle (degrees, wrapped) and declination of the body at times t for longitudes
+def _hour_angle(track, t, longitude):
+    right_ascension, declination = track.at(t)
+    return _wrap(greenwich_sidereal_time(t) + longitude - right_ascension), declination
+
+# Altitude (degrees) of the body at times t for the sites, and its rate of change
+# (degrees per second) from the hour angle's motion
+def _altitude(track, t, latitude, longitude, rate):
+    hour_angle, declination = _hour_angle(track, t, longitude)
+    lat = np.radians(latitude)
+    dec = np.radians(declination)
+    hour_angle = np.radians(hour_angle)
+    altitude = np.arcsin(np.sin(lat) * np.sin(dec) + np.cos(lat) * np.cos(dec) * np.cos(hour_angle))
+    return np.degrees(altitude), -np.cos(lat) * np.cos(dec) * np.sin(hour_angle) * rate / np.cos(altitude)
+
+# Hour angle at which the body's centre stands at `altitude`; NaN where it never gets
+# there, or the nearest hour angle (0 or 180) when clipped
+def _horizon_hour_angle(latitude, declination, altitude, clip=False):
+    lat = np.radians(latitude)
+    dec = np.radians(declination)
+    cos_h0 = (np.sin(np.radians(altitude)) - np.sin(lat) * np.sin(dec)) / (np.cos(lat) * np.cos(dec))
+    if clip:
+        return np.degrees(np.arccos(np.clip(cos_h0, -1, 1)))
+    with np.errstate(invalid="ignore"):
+        return np.degrees(np.arccos(np.where(np.abs(cos_h0) <= 1, cos_h0, np.nan)))
+
+# Solve one chunk of sites; arrays are (sites, days + 2) candidates around the requested days
+def _solve(track, body, latitude, longitude, day_starts, altitude):
+    rate = HOUR_ANGLE_RATE[body]
+    latitude = latitude[:, np.newaxis]
+    longitude = longitude[:, np.newaxis]
+
+    # Transit: start at local mean noon and drive the hour angle to zero
+    transit = day_starts + SECONDS_PER_DAY / 2
+    for _ in range(ITERATIONS):
+        hour_angle, _ = _hour_angle(track, transit, longitude)
+        transit = transit - hour_angle / rate
+    _, declination = track.at(transit)
+    transit_altitude = 90 - np.abs(latitude - declination)
+
+    # Rise and set: start from the horizon hour angle at transit, then refine each
+    # time with the declination and hour angle at the current estimate. The hour angle
+    # is clipped while iterating, because near the poles a body that is circumpolar at
+    # transit can still cross the horizon later as its declination changes
+    horizon = _horizon_hour_angle(latitude, declination, altitude, clip=True)
+    rise = transit - horizon / rate
+    set_ = transit + horizon / rate
+    for _ in range(ITERATIONS):
+        hour_angle, declination = _hour_angle(track, rise, longitude)
+        rise = rise - _wrap(hour_angle + _horizon_hour_angle(latitude, declination, altitude, clip=True)) / rate
+        hour_angle, declination = _hour_angle(track, set_, longitude)
+        set_ = set_ - _wrap(hour_angle - _horizon_hour_angle(latitude, declination, altitude, clip=True)) / rate
+
+    # Polish with Newton steps on the altitude itself; near the poles the horizon hour
+    # angle is very sensitive to the declination and the steps above can wobble
+    for estimate in (rise, set_):
+        for _ in range(POLISH_ITERATIONS):
+            current, slope = _altitude(track, estimate, latitude, longitude, rate)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                step = (current - altitude) / slope
+            estimate -= np.clip(np.nan_to_num(step), -MAX_POLISH_STEP, MAX_POLISH_STEP)
+
+    # Keep only estimates where the body really reaches the horizon altitude
+    for estimate in (rise, set_):
+        _, declination = track.at(estimate)
+        estimate[np.isnan(_horizon_hour_angle(latitude, declination, altitude))] = np.nan
+    return rise, transit, set_, transit_altitude
+
+# Place candidate events (or values attached to them) into the local day they fall in
+# (NaN where a day has none)
+def _assign(candidates, first_day_start, days, values=None):
+    values = candidates if values is None else values
+    result = np.full((candidates.shape[0], days), np.nan)
+    index = np.floor((candidates - first_day_start[:, np.newaxis]) / SECONDS_PER_DAY)
+    valid = np.isfinite(candidates) & (index >= 0) & (index < days)
+    rows = np.broadcast_to(np.arange(candidates.shape[0])[:, np.newaxis], candidates.shape)
+    result[rows[valid], index[valid].astype(np.int64)] = values[valid]
+    return result
+
+# Rise, transit and set times (epoch seconds, UTC) of `body` for every site and local day.
+# Returns a dict of (sites, days) arrays: rise, transit, set (NaN when the event does not
+# happen that day) and transit_altitude (degrees, at that day's transit). Each day holds
+# at most one event of each kind; above about 60 degrees latitude the Moon can
+# occasionally rise or set twice in one local day, and then the later event is kept.
+def rise_set_transit(body, latitudes, longitudes, start_date, days, altitude=None, chunk_sites=2000):
+    if body not in BODIES:
+        raise ValueError(f"Unknown body {body!r}; expected one of {', '.join(BODIES)}")
+    altitude = HORIZON_ALTITUDE[body] if altitude is None else altitude
+    latitudes = np.atleast_1d(np.asarray(latitudes, dtype=np.float64))
+    longitudes = np.atleast_1d(np.asarray(longitudes, dtype=np.float64))
+    midnight = float(to_epoch_seconds(np.datetime64(start_date, "D")))
+
+    # Local mean midnight for every site, with one extra candidate day on each side
+    first_day_start = midnight - longitudes / 360 * SECONDS_PER_DAY
+    offsets = np.arange(-1, days + 1) * SECONDS_PER_DAY
+    track = _Track(body, first_day_start.min() - 2 * SECONDS_PER_DAY, first_day_start.max() + (days + 2) * SECONDS_PER_DAY)
+
+    results = {name: np.empty((len(latitudes), days)) for name in EVENTS + ("transit_altitude",)}
+    for first in range(0, len(latitudes), chunk_sites):
+        sites = slice(first, first + chunk_sites)
+        day_starts = first_day_start[sites, np.newaxis] + offsets
+        rise, transit, set_, transit_altitude = _solve(track, body, latitudes[sites], longitudes[sites], day_starts, altitude)
+        results["rise"][sites] = _assign(rise, first_day_start[sites], days)
+        results["transit"][sites] = _assign(transit, first_day_start[sites], days)
+        results["set"][sites] = _assign(set_, first_day_start[sites], days)
+        results["transit_altitude"][sites] = _assign(transit, first_day_start[sites], days, transit_altitude)
+    return results
+
+def _format(epoch_seconds):
+    if not np.isfinite(epoch_seconds):
+        return "--:--"
+    return datetime.fromtimestamp(epoch_seconds, timezone.utc).strftime("%H:%M")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sunrise/sunset/moonrise/moonset and transit times (UTC).")
+    parser.add_argument("--location", default="17.612778,80.042167", help="Place name or 'latitude,longitude'")
+    parser.add_argument("--start", default=datetime.now(timezone.utc).strftime("%Y-%m-%d"), help="First date, e.g. 2024-11-15")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--benchmark-sites", type=int, metavar="N",
+                        help="Time a run for N random sites over --days days instead of printing a table")
+    args = parser.parse_args(argv)
+
+    if args.benchmark_sites:
+        rng = np.random.default_rng(0)
+        latitudes = rng.uniform(-60, 60, args.benchmark_sites)
+        longitudes = rng.uniform(-180, 180, args.benchmark_sites)
+        for body in BODIES:
+            started = time.perf_counter()
+            rise_set_transit(body, latitudes, longitudes, args.start, args.days)
+            elapsed = time.perf_counter() - started
+            print(f"{body}: {args.benchmark_sites} sites x {args.days} days in {elapsed:.2f}s "
+                  f"({args.benchmark_sites * args.days / elapsed:,.0f} site-days/s)")
+        return
+
+    from geocoding import resolve_location
+
+    latitude, longitude = resolve_location(args.location)
+    if latitude is None:
+        print("Could not find the location. Please enter a valid location.")
+        raise SystemExit(1)
+    sun = rise_set_transit("sun", latitude, longitude, args.start, args.days)
+    moon = rise_set_transit("moon", latitude, longitude, args.start, args.days)
+    print("date        sunrise  transit  sunset   moonrise transit  moonset   (UTC)")
+    for day in range(args.days):
+        date = np.datetime64(args.start, "D") + day
+        times = [_format(events[name][0, day]) for events in (sun, moon) for name in EVENTS]
+        print(f"{date}  " + "    ".join(times))
+
+if __name__ == "__main__":
+    main()
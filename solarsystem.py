@@ -0,0 +1,226 @@
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+# One command-line entry point for every tool in the repository.
+# Nothing heavy is imported at start-up: each subcommand imports its module only when
+# it runs, the numeric `position` command never loads matplotlib (and loads the
+# geocoder only for place names), and `position --service` answers through a running
+# position_service.py without importing NumPy at all. `startup` measures cold-start
+# time of a text answer and keeps a history of the measurements; the budget applies to
+# the paths that stay clear of NumPy (--help and position --service), since importing
+# NumPy alone takes about as long as the budget. Flags before the command turn on stage
+# timings, cProfile or tracemalloc (see instrumentation.py).
+
+STARTUP_BUDGET_MS = 100.0  # For --help and position --service; a local answer imports NumPy
+STARTUP_HISTORY = "startup_history.json"
+HEAVY_MODULES = ("matplotlib", "geopy", "pyarrow")
+
+# Global flags for instrumentation.py (the same switches as its SOLARSYSTEM_* variables)
+INSTRUMENTATION_FLAGS = {
+    "--metrics": ("", "Print time per stage (geocode, compute, plot, savefig, show) at exit"),
+    "--metrics-log": ("PATH", "Also append one JSON line per timed span to PATH (- = stderr)"),
+    "--profile": ("PATH", "Run under cProfile and write the stats to PATH"),
+    "--trace-memory": ("", "Trace allocations with tracemalloc (peak bytes per stage)"),
+}
+
+# Subcommands that hand the remaining arguments to another module's main()
+COMMANDS = {
+    "rise-set": ("rise_set", "Sunrise/sunset, moonrise/moonset and transit times"),
+    "phases": ("lunar_phases", "New moons, quarters and full moons between two dates"),
+    "batch": ("batch", "Add Sun/Moon positions to a table of (lat, lon, time) rows"),
+    "tracks": ("track_export", "Stream Sun/Moon tracks to Parquet/Arrow/CSV/NDJSON"),
+    "raster": ("raster", "Daylight hours, noon altitude and Moon-up rasters over a lat/lon grid"),
+    "tables": ("lookup_tables", "Build, check and query precomputed site tables"),
+    "memo": ("memo_cache", "Inspect, warm or clear the persistent ephemeris memo cache"),
+    "geocode": ("bulk_geocoder", "Geocode a long list of place names"),
+    "serve": ("position_service", "Run the HTTP/JSON position service"),
+    "render": ("rendering", "Render charts for locations to PNG"),
+    "render-pool": ("batch_render", "Render charts for many locations in parallel"),
+    "live": ("live_view", "Live Sun and Moon sky view"),
+    "video": ("video_export", "Export an MP4/GIF animation"),
+}
+
+def _format_position(answer):
+    lines = [f"{answer['latitude']:.4f}, {answer['longitude']:.4f} at {answer['time']} ({answer['model']}, {answer.get('accuracy', 'fast')})"]
+    for body in ("sun", "moon"):
+        values = "  ".join(f"{name} {value:8.3f}" for name, value in answer[body].items())
+        lines.append(f"{body.capitalize():5} {values}")
+    return "\n".join(lines)
+
+# Answer through a running position_service.py (plain http). A bare HTTP/1.0 request
+# over a socket keeps this path clear of urllib.request/http.client, which alone cost
+# several times more to import than the rest of the answer
+def _position_from_service(url, location, when, model, accuracy="fast"):
+    import socket
+    from urllib.parse import urlencode, urlsplit
+
+    parts = urlsplit(url)
+    query = urlencode({"location": location, "time": when or "now", "model": model, "accuracy": accuracy})
+    with socket.create_connection((parts.hostname, parts.port or 80), timeout=10) as connection:
+        connection.sendall(f"GET {parts.path.rstrip('/')}/position?{query} HTTP/1.0\r\n"
+                           f"Host: {parts.hostname}\r\n\r\n".encode("ascii"))
+        response = b"".join(iter(lambda: connection.recv(65536), b""))
+    answer = json.loads(response.partition(b"\r\n\r\n")[2])
+    if "error" in answer:
+        raise ValueError(answer["error"])
+    return answer
+
+def _position_locally(location, when, model, accuracy="fast"):
+    from geocoding import parse_coordinates
+    from positions import compute_answer, parse_time
+
+    coordinates = parse_coordinates(location)
+    if coordinates is None:
+        from geocoding import get_geocoder
+
+        coordinates = get_geocoder().lookup(location)
+    latitude, longitude = coordinates
+    epoch_seconds = parse_time(when)
+    answer = compute_answer(latitude, longitude, epoch_seconds, model, accuracy=accuracy)
+    answer_time = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(epoch_seconds))
+    return dict(answer, latitude=latitude, longitude=longitude, time=answer_time, model=model, accuracy=accuracy)
+
+def position(argv):
+    parser = argparse.ArgumentParser(prog="solarsystem.py position", description="Print Sun and Moon positions as text or JSON.")
+    parser.add_argument("location", help="Place name or 'latitude,longitude'")
+    parser.add_argument("--time", default=None, help="UTC time (ISO 8601 or epoch seconds; default now)")
+    parser.add_argument("--model", default="sky", choices=("sky", "positions", "angles", "simulation"))
+    parser.add_argument("--accuracy", default="fast", choices=("fast", "precise"),
+                        help="precise: full lunar series, nutation, parallax and refraction (sky model)")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of text")
+    parser.add_argument("--service", default=os.environ.get("SOLARSYSTEM_SERVICE_URL"),
+                        help="Ask a running position_service.py at this URL instead of computing locally")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.service:
+            answer = _position_from_service(args.service, args.location, args.time, args.model, args.accuracy)
+        else:
+            answer = _position_locally(args.location, args.time, args.model, args.accuracy)
+    except ValueError as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+    print(json.dumps(answer) if args.json else _format_position(answer))
+
+# Median wall-clock time of a fresh interpreter running `argv`, in milliseconds
+def measure_cold_start(argv, runs=10, env=None):
+    command = [sys.executable, os.path.abspath(__file__)] + argv
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, env=env)
+        times.append((time.perf_counter() - started) * 1000)
+    times.sort()
+    return {"median_ms": times[len(times) // 2], "min_ms": times[0], "max_ms": times[-1]}
+
+# Heavy modules that the command loads, checked in a fresh interpreter
+def loaded_heavy_modules(argv, env=None):
+    code = (f"import sys, runpy; sys.argv = {[os.path.abspath(__file__)] + argv!r}; "
+            f"sys.stdout = open(__import__('os').devnull, 'w')\n"
+            f"try:\n    runpy.run_path(sys.argv[0], run_name='__main__')\nfinally:\n"
+            f"    sys.stderr.write(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+    return [name for name in result.stderr.strip().split(",") if name]
+
+def startup(argv):
+    parser = argparse.ArgumentParser(prog="solarsystem.py startup", description="Measure cold-start time of a text answer.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--location", default="17.612778,80.042167")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_MS, help="Target in milliseconds")
+    parser.add_argument("--service", default=None, help="Also measure answers through a running service at this URL")
+    parser.add_argument("--history", default=None, help=f"JSON file to append results to (default: cache dir/{STARTUP_HISTORY})")
+    args = parser.parse_args(argv)
+
+    # name: (arguments, held to the budget); the local answer is measured for the history only
+    cases = {"help": (["--help"], True), "position": (["position", args.location], False)}
+    if args.service:
+        cases["position --service"] = (["position", args.location, "--service", args.service], True)
+    env = dict(os.environ, SOLARSYSTEM_GEOCODER="offline")
+
+    record = {"time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "python": sys.version.split()[0],
+              "budget_ms": args.budget, "results": {}}
+    over_budget = False
+    for name, (case, budgeted) in cases.items():
+        result = measure_cold_start(case, args.runs, env)
+        result["heavy_modules"] = loaded_heavy_modules(case, env)
+        record["results"][name] = result
+        within = result["median_ms"] <= args.budget
+        over_budget |= budgeted and not within
+        status = ("ok" if within else "over budget") if budgeted else "not budgeted (imports NumPy)"
+        print(f"{name:20} median {result['median_ms']:6.1f} ms  min {result['min_ms']:6.1f} ms  "
+              f"{status}  heavy imports: {', '.join(result['heavy_modules']) or 'none'}")
+    if not args.service:
+        print(f"Pass --service URL to check a position answer against the {args.budget:.0f} ms budget")
+
+    from geocoding import CACHE_DIR
+
+    history_path = args.history or os.path.join(CACHE_DIR, STARTUP_HISTORY)
+    history = []
+    if os.path.exists(history_path):
+        with open(history_path) as handle:
+            history = json.load(handle)
+    history.append(record)
+    os.makedirs(os.path.dirname(os.path.abspath(history_path)), exist_ok=True)
+    with open(history_path, "w") as handle:
+        json.dump(history, handle, indent=2)
+    if len(history) > 1:
+        previous = history[-2]["results"].get("position", {}).get("median_ms")
+        if previous:
+            print(f"position: {record['results']['position']['median_ms'] - previous:+.1f} ms since the previous run")
+    if over_budget:
+        raise SystemExit(1)
+
+# Instrumentation flags given before the command; instrumentation.py is only imported
+# when one is present, so the plain commands keep their start-up time
+def _apply_instrumentation_flags(argv):
+    options = {}
+    while argv and argv[0] in INSTRUMENTATION_FLAGS:
+        flag = argv.pop(0)
+        if flag == "--trace-memory":
+            options["trace_memory"] = True
+        elif flag == "--metrics":
+            options.setdefault("metrics", "1")
+        elif not argv:
+            print(f"{flag} needs a path")
+            raise SystemExit(2)
+        elif flag == "--metrics-log":
+            options["metrics"] = argv.pop(0)
+        else:
+            options["profile"] = argv.pop(0)
+    if options:
+        from instrumentation import configure
+
+        configure(**options)
+    return argv
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    argv = _apply_instrumentation_flags(argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print("usage: solarsystem.py [instrumentation flags] <command> [options]\n\ncommands:")
+        print(f"  {'position':12} Print Sun and Moon positions as text or JSON (no plotting imports)")
+        print(f"  {'startup':12} Measure cold-start time of a text answer")
+        for command, (_, description) in COMMANDS.items():
+            print(f"  {command:12} {description}")
+        print("\ninstrumentation flags:")
+        for flag, (metavar, description) in INSTRUMENTATION_FLAGS.items():
+            print(f"  {(flag + ' ' + metavar).strip():18} {description}")
+        return
+    command, rest = argv[0], argv[1:]
+    if command == "position":
+        return position(rest)
+    if command == "startup":
+        return startup(rest)
+    if command not in COMMANDS:
+        print(f"Unknown command {command!r}; run solarsystem.py --help for the list")
+        raise SystemExit(2)
+    module = importlib.import_module(COMMANDS[command][0])
+    return module.main(rest)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import csv
+import itertools
+import json
+import os
+
+import numpy as np
+
+# Parquet support is optional; CSV works with the standard library alone
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Pick the table format from the file extension
+def table_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".parquet", ".pq"):
+        return "parquet"
+    if extension in (".arrow", ".feather"):
+        return "arrow"
+    if extension in (".csv", ".txt"):
+        return "csv"
+    if extension in (".ndjson", ".jsonl"):
+        return "ndjson"
+    raise ValueError(f"Unsupported table format: {path}")
+
+def _require_pyarrow():
+    if pq is None:
+        raise RuntimeError("Parquet support requires pyarrow (pip install pyarrow).")
+
+# Read a CSV file in chunks of at most chunk_size rows; yields {column: array}
+def read_csv_chunks(path, chunk_size):
+    with open(path, newline="") as handle:
+        reader = csv.reader(handle)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError(f"Empty CSV file (no header row): {path}")
+        while True:
+            rows = list(itertools.islice(reader, chunk_size))
+            if not rows:
+                break
+            columns = zip(*rows)
+            yield {name: np.array(values) for name, values in zip(header, columns)}
+
+# Read a Parquet file in record batches of at most chunk_size rows
+def read_parquet_chunks(path, chunk_size):
+    _require_pyarrow()
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size):
+        yield {name: column.to_numpy(zero_copy_only=False) for name, column in zip(batch.schema.names, batch.columns)}
+
+# Read an Arrow IPC file record batch by record batch, re-sliced to at most chunk_size rows
+def read_arrow_chunks(path, chunk_size):
+    _require_pyarrow()
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        for index in range(reader.num_record_batches):
+            batch = reader.get_batch(index)
+            for first in range(0, batch.num_rows, chunk_size):
+                part = batch.slice(first, chunk_size)
+                yield {name: column.to_numpy(zero_copy_only=False) for name, column in zip(part.schema.names, part.columns)}
+
+# Read newline-delimited JSON objects in chunks; the keys of the first object are the columns
+def read_ndjson_chunks(path, chunk_size):
+    with open(path) as handle:
+        while True:
+            lines = list(itertools.islice(handle, chunk_size))
+            if not lines:
+                break
+            rows = [json.loads(line) for line in lines if line.strip()]
+            if not rows:
+                continue  # A chunk of blank lines, not the end of the file
+            yield {name: np.array([row.get(name) for row in rows]) for name in rows[0]}
+
+# Read any supported table in chunks
+def read_chunks(path, chunk_size):
+    readers = {"parquet": read_parquet_chunks, "arrow": read_arrow_chunks, "ndjson": read_ndjson_chunks}
+    return readers.get(table_format(path), read_csv_chunks)(path, chunk_size)
+
+# Format a column for CSV output (floats at fixed precision, everything else as text)
+def _format_column(values, precision):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.floating):
+        # One %-format over the whole column is several times faster than np.char.mod
+        return (f"%.{precision}f\n" * len(values) % tuple(values.tolist())).split("\n")[:-1]
+    return values.astype(str)
+
+# Streaming CSV writer: the header comes from the first chunk
+class CsvChunkWriter:
+    def __init__(self, path, precision=6):
+        self.handle = open(path, "w", newline="")
+        self.writer = csv.writer(self.handle)
+        self.precision = precision
+        self.columns = None
+
+    def write(self, chunk):
+        if self.columns is None:
+            self.columns = list(chunk)
+            self.writer.writerow(self.columns)
+        formatted = [_format_column(chunk[name], self.precision) for name in self.columns]
+        self.writer.writerows(zip(*formatted))
+
+    def close(self):
+        self.handle.close()
+
+# Streaming Parquet writer: one row group per chunk
+class ParquetChunkWriter:
+    def __init__(self, path):
+        _require_pyarrow()
+        self.path = path
+        self.writer = None
+
+    def write(self, chunk):
+        table = pa.table({name: np.asarray(values) for name, values in chunk.items()})
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+# Streaming Arrow IPC (Feather v2) writer: one record batch per chunk
+class ArrowChunkWriter:
+    def __init__(self, path):
+        _require_pyarrow()
+        self.path = path
+        self.sink = None
+        self.writer = None
+
+    def write(self, chunk):
+        batch = pa.record_batch({name: np.asarray(values) for name, values in chunk.items()})
+        if self.writer is None:
+            self.sink = pa.OSFile(self.path, "wb")
+            self.writer = pa.ipc.new_file(self.sink, batch.schema)
+        self.writer.write_batch(batch)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.sink.close()
+
+# Format a column as JSON literals (NaN and infinities become null)
+def _json_column(values, precision):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.bool_):
+        return np.where(values, "true", "false")
+    if np.issubdtype(values.dtype, np.floating):
+        formatted = np.array(_format_column(values, precision), dtype=object)
+        formatted[~np.isfinite(values)] = "null"
+        return formatted
+    if np.issubdtype(values.dtype, np.integer):
+        return values.astype(str)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return [f'"{value}"' for value in values.astype(str)]
+    return [json.dumps(str(value)) for value in values]
+
+# Streaming NDJSON writer: one JSON object per row, keys in the first chunk's column order
+class NdjsonChunkWriter:
+    def __init__(self, path, precision=6):
+        self.handle = open(path, "w")
+        self.precision = precision
+        self.columns = None
+        self.template = None
+
+    def write(self, chunk):
+        if self.columns is None:
+            self.columns = list(chunk)
+            fields = ", ".join(json.dumps(name).replace("%", "%%") + ": %s" for name in self.columns)
+            self.template = "{" + fields + "}\n"
+        formatted = [_json_column(chunk[name], self.precision) for name in self.columns]
+        self.handle.write("".join(self.template % row for row in zip(*formatted)))
+
+    def close(self):
+        self.handle.close()
+
+# Open a chunk writer matching the output file extension
+def open_writer(path):
+    writers = {"parquet": ParquetChunkWriter, "arrow": ArrowChunkWriter, "ndjson": NdjsonChunkWriter}
+    return writers.get(table_format(path), CsvChunkWriter)(path)
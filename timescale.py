@@ -0,0 +1,195 @@
+import calendar
+import functools
+import os
+import warnings
+from datetime import datetime
+
+import numpy as np
+
+from ephemeris import JD_UNIX_EPOCH, SECONDS_PER_DAY, delta_t, greenwich_sidereal_time, hour_of_day
+
+# Vectorized time layer.
+# Everything works on arrays of Unix epoch seconds (UTC): one call turns a whole array
+# into Julian dates (UT and TT), sidereal times and local clock times, with no
+# per-timestamp datetime objects.
+#
+# A site's time zone comes from, in order:
+#   1. timezonefinder's offline boundary index, when the package is installed
+#   2. the nearest gazetteer place within MAX_GAZETTEER_KM, i.e. the place's own
+#      neighbourhood (approximate near borders)
+#   3. the nautical zone Etc/GMT+-N of the longitude, no daylight saving
+# timezonefinder is a declared dependency; without it a warning is issued once and the
+# fallbacks are an approximation away from the gazetteer places.
+# Zones are cached per rounded site, and each zone's UTC offsets are cached per year as a
+# table of transition instants, so converting N timestamps is one searchsorted.
+
+SITE_DECIMALS = 2  # About 1 km; sites closer than that share a zone lookup
+SITE_CACHE_SIZE = 4096
+ZONE_YEAR_CACHE_SIZE = 1024
+MAX_GAZETTEER_KM = 75.0  # Farther away a city's zone is often the wrong one (Kashgar is not on Karachi time)
+OFFSET_SAMPLE_SECONDS = 6 * 3600  # Offsets are sampled this often, then transitions are bisected to the second
+EARTH_RADIUS_KM = 6371.0
+
+# Julian dates and sidereal times in one pass: {"jd_ut", "jd_tt", "delta_t", "gmst"},
+# plus "lst" (degrees) when a longitude is given
+def time_scales(epoch_seconds, longitude=None):
+    t = np.asarray(epoch_seconds, dtype=np.float64)
+    jd_ut = t / SECONDS_PER_DAY + JD_UNIX_EPOCH
+    difference = delta_t(t)
+    scales = {"jd_ut": jd_ut, "jd_tt": jd_ut + difference / SECONDS_PER_DAY, "delta_t": difference,
+              "gmst": greenwich_sidereal_time(t)}
+    if longitude is not None:
+        scales["lst"] = np.mod(scales["gmst"] + np.asarray(longitude), 360)
+    return scales
+
+@functools.lru_cache(maxsize=None)
+def _zone(name):
+    from zoneinfo import ZoneInfo
+
+    return ZoneInfo(name)
+
+def _offset(zone, epoch_seconds):
+    return datetime.fromtimestamp(epoch_seconds, zone).utcoffset().total_seconds()
+
+# One zone's UTC offsets over a calendar year as (instants, offsets): offsets[i] applies
+# from instants[i] until the next instant
+@functools.lru_cache(maxsize=ZONE_YEAR_CACHE_SIZE)
+def zone_year_offsets(name, year):
+    zone = _zone(name)
+    start = calendar.timegm((year, 1, 1, 0, 0, 0))
+    stop = calendar.timegm((year + 1, 1, 1, 0, 0, 0))
+    instants, offsets = [start], [_offset(zone, start)]
+    low = start
+    while low < stop:
+        high = min(low + OFFSET_SAMPLE_SECONDS, stop)
+        offset = _offset(zone, high)
+        if offset != offsets[-1]:
+            # Bisect to the first second with the new offset
+            while high - low > 1:
+                middle = (low + high) // 2
+                if _offset(zone, middle) == offsets[-1]:
+                    low = middle
+                else:
+                    high = middle
+            instants.append(high)
+            offsets.append(offset)
+        low = high
+    instants, offsets = np.array(instants, dtype=np.float64), np.array(offsets, dtype=np.float64)
+    instants.flags.writeable = offsets.flags.writeable = False  # Shared through the cache
+    return instants, offsets
+
+# Calendar year (UTC) of each timestamp
+def _years(epoch_seconds):
+    return np.floor(epoch_seconds).astype(np.int64).astype("datetime64[s]").astype("datetime64[Y]").astype(np.int64) + 1970
+
+# UTC offset in seconds of a named zone at each timestamp
+def utc_offsets(epoch_seconds, zone_name):
+    t = np.asarray(epoch_seconds, dtype=np.float64)
+    if t.size == 0:
+        return np.zeros(t.shape)
+    first, last = _years(np.array([t.min(), t.max()]))
+    tables = [zone_year_offsets(zone_name, int(year)) for year in range(first, last + 1)]
+    instants = np.concatenate([table[0] for table in tables])
+    offsets = np.concatenate([table[1] for table in tables])
+    return offsets[np.clip(np.searchsorted(instants, t, side="right") - 1, 0, len(offsets) - 1)]
+
+# Nautical time zone of a longitude (Etc/GMT+N is N hours *behind* UTC)
+def nautical_zone(longitude):
+    hours = int(np.clip(np.round(longitude / 15), -12, 12))
+    return "Etc/GMT" if hours == 0 else f"Etc/GMT{-hours:+d}"
+
+@functools.lru_cache(maxsize=1)
+def _gazetteer_zones():
+    from geocoding import load_gazetteer
+
+    places = [place for place in load_gazetteer().values() if place[2]]
+    if not places:
+        return np.empty((0, 2)), []
+    return np.radians([place[:2] for place in places]), [place[2] for place in places]
+
+# Nearest gazetteer place with a known zone and its distance in km (None if there is none)
+def nearest_gazetteer_zone(latitude, longitude):
+    coordinates, zones = _gazetteer_zones()
+    if not zones:
+        return None, None
+    lat, lon = np.radians(latitude), np.radians(longitude)
+    half_chord = (np.sin((coordinates[:, 0] - lat) / 2) ** 2
+                  + np.cos(lat) * np.cos(coordinates[:, 0]) * np.sin((coordinates[:, 1] - lon) / 2) ** 2)
+    nearest = int(np.argmin(half_chord))
+    return zones[nearest], 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(min(half_chord[nearest], 1.0)))
+
+# timezonefinder's boundary index is loaded once; None (with a warning) when the package
+# is not installed
+@functools.lru_cache(maxsize=1)
+def _finder():
+    try:
+        from timezonefinder import TimezoneFinder
+    except ImportError:
+        warnings.warn("timezonefinder is not installed (pip install timezonefinder); site time zones fall back to "
+                      f"the nearest gazetteer place within {MAX_GAZETTEER_KM:.0f} km, else the nautical zone of the longitude",
+                      stacklevel=5)
+        return None
+    return TimezoneFinder()
+
+def _timezonefinder_zone(latitude, longitude):
+    finder = _finder()
+    return finder.timezone_at(lat=latitude, lng=longitude) if finder is not None else None
+
+@functools.lru_cache(maxsize=SITE_CACHE_SIZE)
+def _site_timezone(latitude, longitude):
+    name = _timezonefinder_zone(latitude, longitude)
+    if name:
+        return name, "timezonefinder"
+    name, distance = nearest_gazetteer_zone(latitude, longitude)
+    if name and distance <= MAX_GAZETTEER_KM:
+        return name, "gazetteer"
+    return nautical_zone(longitude), "nautical"
+
+# IANA zone name for a site and where it came from ("timezonefinder", "gazetteer" or "nautical")
+def site_timezone(latitude, longitude):
+    return _site_timezone(round(float(latitude), SITE_DECIMALS), round(float(longitude), SITE_DECIMALS))
+
+# The machine's own zone (TZ, else /etc/localtime), for clocks not tied to a site
+def system_timezone():
+    name = os.environ.get("TZ", "").lstrip(":")
+    if not name:
+        path = os.path.realpath("/etc/localtime")
+        name = path.split("zoneinfo/", 1)[1] if "zoneinfo/" in path else "UTC"
+    try:
+        _zone(name)
+    except (ValueError, OSError, LookupError):
+        return "UTC"
+    return name
+
+# UTC offsets in seconds for timestamps at sites; latitude/longitude broadcast against
+# the timestamps, and each distinct zone is converted with one searchsorted
+def site_utc_offsets(epoch_seconds, latitude, longitude):
+    t, lat, lon = np.broadcast_arrays(np.asarray(epoch_seconds, dtype=np.float64),
+                                      np.asarray(latitude, dtype=np.float64), np.asarray(longitude, dtype=np.float64))
+    if np.ndim(latitude) == 0 and np.ndim(longitude) == 0:
+        return utc_offsets(t, site_timezone(latitude, longitude)[0])
+    sites, site_index = np.unique(np.stack([lat.ravel().round(SITE_DECIMALS), lon.ravel().round(SITE_DECIMALS)], axis=1),
+                                  axis=0, return_inverse=True)
+    zones = np.array([site_timezone(*site)[0] for site in sites])[site_index.ravel()]
+    offsets = np.empty(t.size)
+    flat_times = t.ravel()
+    for zone in np.unique(zones):
+        selected = zones == zone
+        offsets[selected] = utc_offsets(flat_times[selected], zone)
+    return offsets.reshape(t.shape)
+
+# Offsets for a site, a named zone, or (neither given) the machine's zone
+def _offsets(epoch_seconds, latitude, longitude, zone):
+    if zone is None and latitude is not None and longitude is not None:
+        return site_utc_offsets(epoch_seconds, latitude, longitude)
+    return utc_offsets(epoch_seconds, zone or system_timezone())
+
+# Local clock time as fractional hours (0-24) at a site or in a zone
+def local_hours(epoch_seconds, latitude=None, longitude=None, zone=None):
+    t = np.asarray(epoch_seconds, dtype=np.float64)
+    return hour_of_day(t + _offsets(t, latitude, longitude, zone))
+
+# Local wall-clock times as datetime64[s] at a site or in a zone
+def local_datetimes(epoch_seconds, latitude=None, longitude=None, zone=None):
+    t = np.asarray(epoch_seconds, dtype=np.float64)
+    return np.floor(t + _offsets(t, latitude, longitude, zone)).astype(np.int64).astype("datetime64[s]")
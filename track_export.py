@@ -0,0 +1,110 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from ephemeris import ACCURACY_TIERS, to_epoch_seconds, annual_sun_xy, annual_moon_xy
+from table_io import open_writer
+from tracks import BODIES, Track, body_altaz
+
+# Streaming export of Sun/Moon tracks.
+# Tracks are produced by generators that yield fixed-size batches of columns
+# ({name: array}), and each batch goes straight to a chunk writer from table_io, so a
+# multi-year, per-minute, multi-site export only ever holds one batch in memory. Body
+# positions are computed into Track arrays (tracks.py) and written from their views.
+
+DEFAULT_BATCH_ROWS = 100000
+
+# Azimuth/altitude tracks for each site from start to stop (exclusive), site after site.
+# `sites` is a list of (label, latitude, longitude); `cache` as in tracks.body_altaz.
+def track_batches(sites, start, stop, step_seconds=60, bodies=("sun", "moon"), batch_rows=DEFAULT_BATCH_ROWS, accuracy="fast",
+                  cache=None):
+    start = float(to_epoch_seconds(start))
+    stop = float(to_epoch_seconds(stop))
+    count = int(np.ceil((stop - start) / step_seconds))
+    for label, latitude, longitude in sites:
+        for first in range(0, count, batch_rows):
+            times = start + np.arange(first, min(first + batch_rows, count)) * step_seconds
+            batch = {
+                "site": np.full(len(times), label),
+                "latitude": np.full(len(times), latitude),
+                "longitude": np.full(len(times), longitude),
+                "time": (times * 1000).astype(np.int64).astype("datetime64[ms]"),
+            }
+            for body in bodies:
+                altaz = body_altaz(body, latitude, longitude, times[0], len(times), step_seconds, accuracy, cache)
+                track = Track.allocate(len(times), body=body, label=label, latitude=latitude, longitude=longitude,
+                                       step=step_seconds).fill(times, accuracy=accuracy, altaz=altaz)
+                batch.update(track.columns(("azimuth", "altitude"), prefix=f"{body}_"))
+            yield batch
+
+# The annual chart paths drawn by 2DPlotforyear.py / 2dKartheekaPournami.py: one row per
+# day and hour with the Sun's and Moon's chart coordinates
+def annual_chart_batches(latitude, days=np.arange(1, 366), hours=np.arange(24), batch_rows=DEFAULT_BATCH_ROWS):
+    day_grid, hour_grid = (grid.ravel() for grid in np.meshgrid(days, hours, indexing="ij"))
+    for first in range(0, len(day_grid), batch_rows):
+        day = day_grid[first:first + batch_rows]
+        hour = hour_grid[first:first + batch_rows]
+        sun_x, sun_y = annual_sun_xy(day, latitude)
+        moon_x, moon_y = annual_moon_xy(day, hour)
+        yield {"day": day, "hour": hour, "sun_x": sun_x, "sun_y": sun_y, "moon_x": moon_x, "moon_y": moon_y}
+
+# Write every batch from a generator to a CSV/Parquet/Arrow/NDJSON file; returns (rows, seconds).
+# Batches are {name: array} dicts or Track objects (written as their field views).
+def export_batches(batches, path, report=None):
+    writer = open_writer(path)
+    rows = 0
+    started = time.perf_counter()
+    try:
+        for batch in batches:
+            if isinstance(batch, Track):
+                batch = batch.columns()
+            writer.write(batch)
+            rows += len(next(iter(batch.values())))
+            if report:
+                elapsed = time.perf_counter() - started
+                report(f"{rows:,} rows ({rows / elapsed:,.0f} rows/s)")
+    finally:
+        writer.close()
+    return rows, time.perf_counter() - started
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream Sun/Moon tracks to a .csv, .parquet, .arrow or .ndjson file.")
+    parser.add_argument("output", help="Output file; the format follows the extension")
+    parser.add_argument("--location", action="append", help="Place name or 'latitude,longitude' (repeatable)")
+    parser.add_argument("--start", default="2024-01-01", help="Start date/time (UTC)")
+    parser.add_argument("--stop", default="2025-01-01", help="End date/time (UTC, exclusive)")
+    parser.add_argument("--step", type=float, default=60, help="Seconds between samples")
+    parser.add_argument("--bodies", nargs="+", choices=tuple(BODIES), default=["sun", "moon"])
+    parser.add_argument("--annual-chart", action="store_true",
+                        help="Export the annual chart paths (day x hour) for the first location instead")
+    parser.add_argument("--batch-rows", type=int, default=DEFAULT_BATCH_ROWS, help="Rows held in memory at once")
+    parser.add_argument("--accuracy", choices=ACCURACY_TIERS, default="fast", help="Ephemeris accuracy tier for the tracks")
+    parser.add_argument("--no-memo", action="store_true", help="Compute every track instead of using the memo cache")
+    parser.add_argument("--quiet", action="store_true", help="Only print the final summary")
+    args = parser.parse_args(argv)
+
+    from geocoding import resolve_location
+
+    sites = []
+    for location in args.location or ["17.612778,80.042167"]:
+        latitude, longitude = resolve_location(location)
+        if latitude is None:
+            print(f"Could not find the location {location!r}. Please enter a valid location.")
+            raise SystemExit(1)
+        sites.append((location, latitude, longitude))
+
+    if args.annual_chart:
+        batches = annual_chart_batches(sites[0][1], batch_rows=args.batch_rows)
+    else:
+        start, stop = (np.datetime64(value) for value in (args.start, args.stop))
+        batches = track_batches(sites, start, stop, args.step, args.bodies, args.batch_rows, args.accuracy,
+                                False if args.no_memo else None)
+    rows, elapsed = export_batches(batches, args.output, report=None if args.quiet else print)
+    size_mb = os.path.getsize(args.output) / 1e6
+    print(f"Wrote {rows:,} rows to {args.output} in {elapsed:.2f}s "
+          f"({rows / max(elapsed, 1e-9):,.0f} rows/s, {size_mb:.1f} MB, {size_mb / max(elapsed, 1e-9):.1f} MB/s)")
+
+if __name__ == "__main__":
+    main()
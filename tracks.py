@@ -0,0 +1,130 @@
+import numpy as np
+
+from ephemeris import PLANETS, calculate_position, moon_altaz, planet_altaz, sun_altaz, to_epoch_seconds
+from memo_cache import get_memo_cache, site_series
+
+# Compact array-backed tracks.
+# A Track keeps one body's samples in a single preallocated structured array, one
+# 28-byte row per sample (time as float64 epoch seconds; x, y, z, azimuth and altitude
+# as float32), instead of parallel lists of boxed floats. Its fields are strided views
+# into that block, time windows are slices of it, and the site/body details live in
+# __slots__ attributes, so slicing, plotting and exporting a track never copies the
+# samples. x, y, z is the unit direction vector (east, north, up), as in lookup_tables.py.
+# Tracks on a regular step go through the memo cache (memo_cache.py), so a site's year is
+# computed once and read back on later runs.
+#
+# float32 keeps angles to about 0.00001 degrees, well below the ephemeris error, and a
+# year of per-minute samples for one body is 14.7 MB.
+
+TRACK_DTYPE = np.dtype([("time", np.float64), ("x", np.float32), ("y", np.float32), ("z", np.float32),
+                        ("azimuth", np.float32), ("altitude", np.float32)])
+
+# Azimuth/altitude function of one planet, with the signature of sun_altaz and moon_altaz
+def _planet_altaz(body):
+    def altaz(epoch_seconds, latitude, longitude, accuracy="fast"):
+        azimuth, altitude = planet_altaz(epoch_seconds, latitude, longitude, (body,), accuracy)
+        return azimuth[0], altitude[0]
+    return altaz
+
+BODIES = {"sun": sun_altaz, "moon": moon_altaz, **{body: _planet_altaz(body) for body in PLANETS}}
+FILL_ROWS = 1 << 18  # Float64 temporaries of the ephemeris are bounded to this many rows
+
+class Track:
+    __slots__ = ("data", "body", "label", "latitude", "longitude", "step")
+
+    def __init__(self, data, body="", label="", latitude=None, longitude=None, step=None):
+        if data.dtype != TRACK_DTYPE:
+            raise ValueError(f"Track data must have dtype {TRACK_DTYPE}, not {data.dtype}")
+        self.data = data
+        self.body = body
+        self.label = label
+        self.latitude = latitude
+        self.longitude = longitude
+        self.step = step
+
+    # An uninitialized track of `count` rows
+    @classmethod
+    def allocate(cls, count, **details):
+        return cls(np.empty(count, dtype=TRACK_DTYPE), **details)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        span = f"{self.data['time'][0]:.0f}..{self.data['time'][-1]:.0f}" if len(self) else "empty"
+        return f"Track({self.body or '?'} {self.label!r}, {len(self)} rows, {span})"
+
+    # A field name gives that column as a view, an integer one row (a record), and a slice
+    # or index array a Track over those rows (a view for slices)
+    def __getitem__(self, key):
+        if isinstance(key, (str, int, np.integer)):
+            return self.data[key]
+        return self._view(self.data[key])
+
+    def _view(self, data):
+        return Track(data, self.body, self.label, self.latitude, self.longitude, self.step)
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    # Rows with start <= time < stop, found by bisection (times are ascending); a view
+    def window(self, start=None, stop=None):
+        times = self.data["time"]
+        first = 0 if start is None else int(np.searchsorted(times, float(to_epoch_seconds(start)), side="left"))
+        last = len(times) if stop is None else int(np.searchsorted(times, float(to_epoch_seconds(stop)), side="left"))
+        return self._view(self.data[first:last])
+
+    # (x, y) or (x, y, z) field views, ready for Line2D.set_data or a 3D plot
+    def xy(self):
+        return self.data["x"], self.data["y"]
+
+    def xyz(self):
+        return self.data["x"], self.data["y"], self.data["z"]
+
+    # The direction vectors as one (rows, 3) float32 view, e.g. for Line3DCollection segments
+    def vectors(self):
+        return np.lib.stride_tricks.as_strided(self.data["x"], shape=(len(self.data), 3),
+                                               strides=(self.data.strides[0], TRACK_DTYPE.fields["y"][1] - TRACK_DTYPE.fields["x"][1]),
+                                               writeable=False)
+
+    # {name: view} for the table_io chunk writers; names get `prefix` (e.g. "sun_")
+    def columns(self, fields=TRACK_DTYPE.names, prefix=""):
+        return {prefix + name: self.data[name] for name in fields}
+
+    # Compute positions for this track's site at `times` into rows [first, first + len(times));
+    # `altaz` passes (azimuth, altitude) already computed for those times
+    def fill(self, times, first=0, accuracy="fast", altaz=None):
+        rows = self.data[first:first + len(times)]
+        rows["time"] = times
+        azimuth, altitude = altaz if altaz is not None else BODIES[self.body](times, self.latitude, self.longitude, accuracy)
+        rows["azimuth"] = azimuth
+        rows["altitude"] = altitude
+        rows["x"], rows["y"], rows["z"] = calculate_position(azimuth, altitude, 1.0)
+        return self
+
+# (azimuth, altitude) of a body at start + i * step_seconds for i < count, through the memo
+# cache: None uses the shared one, False computes directly
+def body_altaz(body, latitude, longitude, start, count, step_seconds=60, accuracy="fast", cache=None):
+    if cache is None:
+        cache = get_memo_cache()
+    return site_series(cache or None, body, BODIES[body], latitude, longitude, start, count, step_seconds, accuracy)
+
+# One body's track for a site from start to stop (exclusive) every `step_seconds`, filled
+# chunk by chunk into a single preallocated array; `cache` as in body_altaz
+def compute_track(body, latitude, longitude, start, stop, step_seconds=60, label="", accuracy="fast", cache=None):
+    if body not in BODIES:
+        raise ValueError(f"Unknown body {body!r}; expected one of {', '.join(BODIES)}")
+    start = float(to_epoch_seconds(start))
+    stop = float(to_epoch_seconds(stop))
+    count = max(0, int(np.ceil((stop - start) / step_seconds)))
+    track = Track.allocate(count, body=body, label=label, latitude=latitude, longitude=longitude, step=step_seconds)
+    for first in range(0, count, FILL_ROWS):
+        rows = min(FILL_ROWS, count - first)
+        track.fill(start + np.arange(first, first + rows) * step_seconds, first, accuracy,
+                   body_altaz(body, latitude, longitude, start + first * step_seconds, rows, step_seconds, accuracy, cache))
+    return track
+
+# Tracks of several bodies over the same times: {body: Track}
+def compute_tracks(bodies, latitude, longitude, start, stop, step_seconds=60, label="", accuracy="fast", cache=None):
+    return {body: compute_track(body, latitude, longitude, start, stop, step_seconds, label, accuracy, cache) for body in bodies}
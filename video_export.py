@@ -0,0 +1,171 @@
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+from matplotlib.animation import FFMpegWriter
+
+from charts import AnnualPathsChart, FullMoonPathsChart
+from ephemeris import annual_sun_xy, annual_moon_xy, annual_moon_xyz
+from rendering import figure_size_for, parse_size
+
+# Animated MP4/GIF export of the annual and full-moon scenes.
+# Frames are piped as raw pixels straight into ffmpeg, so nothing is written as PNG and
+# at most one frame per worker exists in memory. Long animations are split into chunks
+# of frames that worker processes encode in parallel; the encoded segments are then
+# joined without re-encoding (or converted to GIF in a single ffmpeg pass).
+
+SCENES = ("annual", "fullmoon")
+DEFAULT_SIZE = (1280, 1280)
+DEFAULT_DPI = 100
+TRAIL_DAYS = 365  # Only the most recent year of the path is drawn, so frames cost the same in year 10 as in year 1
+
+# Fractional day number for every frame (1.0 = day 1, midnight)
+def frame_days(years, per="day"):
+    step = 1.0 if per == "day" else 1 / 24
+    return 1 + np.arange(int(round(years * 365 / step))) * step
+
+# Sun and Moon annual paths, growing day by day
+class AnnualScene:
+    def __init__(self, latitude, label, figsize):
+        self.latitude = latitude
+        self.chart = AnnualPathsChart(figsize=figsize)
+        self.chart.draw(latitude, label)
+        ax = self.chart.ax
+        self.sun_marker, = ax.plot([], [], 'ro', markersize=8)
+        self.moon_marker, = ax.plot([], [], 'bo', markersize=8)
+        self.clock = ax.text(-1.45, 1.4, "", fontsize=10, va='top')
+        self.fig = self.chart.fig
+
+    def render(self, day):
+        trail = np.arange(max(1, int(day) - TRAIL_DAYS), int(day) + 1)
+        hour = (day % 1) * 24
+        self.chart.sun_line.set_data(*annual_sun_xy(trail, self.latitude))
+        self.chart.moon_line.set_data(*annual_moon_xy(trail, hour))
+        sun_x, sun_y = annual_sun_xy(day, self.latitude)
+        moon_x, moon_y = annual_moon_xy(int(day), hour)
+        self.sun_marker.set_data([sun_x], [sun_y])
+        self.moon_marker.set_data([moon_x], [moon_y])
+        self.clock.set_text(f"Year {int((day - 1) // 365) + 1}, day {int((day - 1) % 365) + 1}, {hour:04.1f}h")
+
+# The Moon moving through the year with the full-moon paths in the background
+class FullMoonScene:
+    def __init__(self, latitude, longitude, label, figsize):
+        self.chart = FullMoonPathsChart(figsize=figsize)
+        self.chart.draw(latitude, longitude, label)
+        ax = self.chart.ax
+        self.trail, = ax.plot([], [], [], color='tab:blue', lw=1)
+        self.marker, = ax.plot([], [], [], 'o', color='tab:blue', markersize=8)
+        self.clock = ax.text2D(0.02, 0.95, "", transform=ax.transAxes, fontsize=10)
+        self.fig = self.chart.fig
+
+    def render(self, day):
+        trail = np.linspace(max(1.0, day - 2), day, 48)  # The last two days of motion
+        self.trail.set_data_3d(*annual_moon_xyz(trail))
+        x, y, z = annual_moon_xyz(day)
+        self.marker.set_data_3d([x], [y], [z])
+        self.clock.set_text(f"Year {int((day - 1) // 365) + 1}, day {int((day - 1) % 365) + 1}")
+
+def make_scene(scene, latitude, longitude, label, size, dpi):
+    figsize = figure_size_for(*size, dpi)
+    if scene == "fullmoon":
+        return FullMoonScene(latitude, longitude, label, figsize)
+    return AnnualScene(latitude, label, figsize)
+
+# Encode one run of frames into a video file; returns (frames, seconds)
+def render_segment(scene, latitude, longitude, label, days, path, fps, size, dpi, ffmpeg_path=None, log_every=0, report=print):
+    if ffmpeg_path:
+        matplotlib.rcParams["animation.ffmpeg_path"] = ffmpeg_path
+    scene_object = make_scene(scene, latitude, longitude, label, size, dpi)
+    writer = FFMpegWriter(fps=fps, codec="libx264", extra_args=["-pix_fmt", "yuv420p"])
+    started = time.perf_counter()
+    with writer.saving(scene_object.fig, path, dpi):
+        for index, day in enumerate(days, 1):
+            scene_object.render(day)
+            writer.grab_frame()
+            if log_every and index % log_every == 0:
+                report(f"{os.path.basename(path)}: {index}/{len(days)} frames, "
+                       f"{(time.perf_counter() - started) / index * 1000:.1f} ms/frame")
+    plt.close(scene_object.fig)
+    return len(days), time.perf_counter() - started
+
+def _render_segment_job(arguments):
+    return render_segment(*arguments, report=print)
+
+# Join encoded segments into the final MP4 (stream copy) or GIF (palette pass)
+def join_segments(segment_paths, output, fps, ffmpeg_path="ffmpeg"):
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as listing:
+        for path in segment_paths:
+            listing.write(f"file '{os.path.abspath(path)}'\n")
+    command = [ffmpeg_path, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", listing.name]
+    if output.lower().endswith(".gif"):
+        command += ["-vf", f"fps={fps},split[a][b];[a]palettegen[p];[b][p]paletteuse"]
+    else:
+        command += ["-c", "copy"]
+    try:
+        subprocess.run(command + [output], check=True)
+    finally:
+        os.remove(listing.name)
+
+# Render a whole animation; frames are split into chunks encoded in parallel
+def export_animation(output, scene="annual", latitude=17.612778, longitude=80.042167, label="Home", years=1.0,
+                     per="day", fps=30, size=DEFAULT_SIZE, dpi=DEFAULT_DPI, workers=None, chunk_frames=240,
+                     ffmpeg_path=None, log_every=0, report=print):
+    size = (size[0] - size[0] % 2, size[1] - size[1] % 2)  # yuv420p needs even dimensions
+    days = frame_days(years, per)
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+
+    with tempfile.TemporaryDirectory(prefix="solarsystem_video_") as workdir:
+        chunks = [days[first:first + chunk_frames] for first in range(0, len(days), chunk_frames)]
+        segments = [os.path.join(workdir, f"segment_{index:05d}.mp4") for index in range(len(chunks))]
+        jobs = [(scene, latitude, longitude, label, chunk, path, fps, size, dpi, ffmpeg_path, log_every)
+                for chunk, path in zip(chunks, segments)]
+        if workers == 1:
+            results = [render_segment(*job, report=report) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_render_segment_job, jobs))
+        for index, (frames, seconds) in enumerate(results):
+            report(f"segment {index + 1}/{len(results)}: {frames} frames, {seconds / frames * 1000:.1f} ms/frame")
+        join_segments(segments, output, fps, ffmpeg_path or matplotlib.rcParams["animation.ffmpeg_path"])
+
+    elapsed = time.perf_counter() - started
+    report(f"Wrote {output}: {len(days)} frames in {elapsed:.1f}s ({elapsed / len(days) * 1000:.1f} ms/frame wall clock)")
+    return len(days), elapsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the annual or full-moon scene as an MP4 or GIF animation.")
+    parser.add_argument("output", help="Output .mp4 or .gif file")
+    parser.add_argument("--scene", choices=SCENES, default="annual")
+    parser.add_argument("--location", default="17.612778,80.042167", help="Place name or 'latitude,longitude'")
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--per", choices=("day", "hour"), default="day", help="One frame per day or per hour")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--size", type=parse_size, default=DEFAULT_SIZE, help="Frame size in pixels, e.g. 1280x1280")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    parser.add_argument("--workers", type=int, default=None, help="Parallel encoder processes (default: one per core)")
+    parser.add_argument("--chunk-frames", type=int, default=240, help="Frames per parallel segment")
+    parser.add_argument("--ffmpeg", default=os.environ.get("SOLARSYSTEM_FFMPEG"), help="Path to the ffmpeg executable")
+    parser.add_argument("--log-every", type=int, default=0, help="Log time per frame every N frames")
+    args = parser.parse_args(argv)
+
+    from geocoding import resolve_location
+
+    latitude, longitude = resolve_location(args.location)
+    if latitude is None:
+        print("Could not find the location. Please enter a valid location.")
+        raise SystemExit(1)
+    export_animation(args.output, args.scene, latitude, longitude, args.location, args.years, args.per, args.fps,
+                     args.size, args.dpi, args.workers, args.chunk_frames, args.ffmpeg, args.log_every)
+
+if __name__ == "__main__":
+    main()